@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""Performance checks for citytime.py and citytime_web.py.
+
+    python3 bench_citytime.py run                        # microbenchmarks vs bench_baseline.json
+    python3 bench_citytime.py run --filter web/ --update-baseline
+    python3 bench_citytime.py importtime                 # -X importtime tracking
+    python3 bench_citytime.py importtime --update-baseline
+
+Everything runs offline against a throwaway HOME, so your real alias file is never
+touched, and the web headline fetch is stubbed. Results are also written to
+bench_output.txt.
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+BASELINE_FILE = ROOT / "bench_baseline.json"
+OUTPUT_FILE = ROOT / "bench_output.txt"
+DEFAULT_THRESHOLD = 0.5
+RUN_THRESHOLD = 0.3
+
+# Modules citytime must not import at startup; each is deferred to the command that needs it
+DEFERRED_MODULES = (
+    "difflib", "pathlib", "importlib.metadata", "csv", "json", "numpy",
+    "concurrent.futures", "urllib.request", "email", "cProfile", "pstats", "sqlite3",
+)
+
+
+def measure_import(module: str = "citytime", runs: int = 15) -> dict:
+    """Best-of-runs ``-X importtime`` profile: total and self microseconds per imported module."""
+    best = None
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, PYTHONPATH=str(ROOT))
+        for _ in range(runs):
+            proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                  env=env, cwd=home, capture_output=True, text=True, check=True)
+            # Nested imports are listed before their parent; keep only those under `module`
+            pending, modules, total = {}, {}, None
+            for line in proc.stderr.splitlines():
+                if not line.startswith("import time:") or "|" not in line:
+                    continue
+                self_us, cumulative_us, name = line[len("import time:"):].split("|")
+                if not self_us.strip().isdigit():
+                    continue
+                pending[name.strip()] = int(self_us)
+                if not name.startswith("  "):
+                    if name.strip() == module:
+                        modules, total = pending, int(cumulative_us)
+                    pending = {}
+            if best is None or total < best["total_us"]:
+                best = {"module": module, "total_us": total, "modules": modules}
+    return best
+
+
+def check_import_time(baseline_file: Path = BASELINE_FILE, threshold: float = DEFAULT_THRESHOLD,
+                      update: bool = False) -> bool:
+    """Report import time; fail on a deferred module import or a slowdown beyond threshold."""
+    result = measure_import()
+    slowest = sorted(result["modules"].items(), key=lambda item: item[1], reverse=True)[:8]
+    print(f"import citytime: {result['total_us'] / 1000:.1f} ms")
+    for name, self_us in slowest:
+        print(f"  {self_us / 1000:6.2f} ms  {name}")
+    ok = True
+    eager = [name for name in result["modules"]
+             if name in DEFERRED_MODULES or name.split(".")[0] in DEFERRED_MODULES]
+    if eager:
+        print(f"❌ Imported at startup but should be deferred: {', '.join(sorted(eager))}")
+        ok = False
+    baselines = json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+    if update:
+        baselines["import_us"] = result["total_us"]
+        baseline_file.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"✅ Baseline updated: {result['total_us'] / 1000:.1f} ms")
+        return ok
+    baseline = baselines.get("import_us")
+    if baseline:
+        change = result["total_us"] / baseline - 1
+        print(f"baseline {baseline / 1000:.1f} ms ({change:+.0%})")
+        if change > threshold:
+            print(f"❌ Import time regressed more than {threshold:.0%}")
+            ok = False
+    return ok
+
+
+class Bench:
+    """Times callables and collects ops/sec and latency percentiles."""
+
+    def __init__(self, min_time: float = 0.3, max_runs: int = 100_000, name_filter: str = ""):
+        self.min_time = min_time
+        self.max_runs = max_runs
+        self.name_filter = name_filter
+        self.results = {}
+
+    def __call__(self, name: str, fn, setup=None, min_runs: int = 5) -> None:
+        """Run fn repeatedly (setup, if given, runs untimed before each call)."""
+        if self.name_filter and self.name_filter not in name:
+            return
+        fn() if setup is None else (setup(), fn())
+        samples = []
+        started = time.perf_counter()
+        while len(samples) < self.max_runs and (len(samples) < min_runs or time.perf_counter() - started < self.min_time):
+            if setup is not None:
+                setup()
+            t0 = time.perf_counter_ns()
+            fn()
+            samples.append(time.perf_counter_ns() - t0)
+        samples.sort()
+
+        def pct(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] / 1000
+
+        mean = sum(samples) / len(samples)
+        self.results[name] = {"ops_per_sec": 1e9 / mean, "runs": len(samples),
+                              "p50_us": pct(0.50), "p90_us": pct(0.90), "p99_us": pct(0.99)}
+        r = self.results[name]
+        print(f"{name:<44} {r['ops_per_sec']:>12,.0f} ops/s  p50 {r['p50_us']:>9.1f}us  "
+              f"p90 {r['p90_us']:>9.1f}us  p99 {r['p99_us']:>9.1f}us  ({r['runs']} runs)")
+
+
+def bench_core(bench: Bench, home: str) -> None:
+    """Alias, validation and matching hot paths in citytime."""
+    import citytime
+
+    alias_file = citytime.ALIAS_FILE
+
+    def write_aliases(lines: int) -> None:
+        with open(alias_file, "w") as f:
+            f.writelines(f"benchcity{i}=America/Chicago\n" for i in range(lines))
+        citytime.ALIAS_STORE.invalidate()
+
+    write_aliases(20)
+    bench("load_aliases/cached", citytime.load_aliases)
+    bench("load_aliases/reload-small", citytime.load_aliases, setup=citytime.ALIAS_STORE.invalidate)
+    write_aliases(50_000)
+    bench("load_aliases/reload-50k", citytime.load_aliases, setup=citytime.ALIAS_STORE.invalidate)
+    sqlite_store = citytime.AliasStore(citytime.SQLiteAliasBackend(os.path.join(home, "aliases.db"),
+                                                                   legacy_path=alias_file))
+    bench("load_aliases/reload-50k-sqlite", sqlite_store.aliases, setup=sqlite_store.invalidate)
+    sqlite_store.invalidate()
+    bench("alias_lookup/sqlite-indexed", lambda: sqlite_store.lookup("benchcity4242"))
+    write_aliases(20)
+    citytime.load_aliases()
+
+    bench("is_valid_timezone/valid", lambda: citytime.is_valid_timezone("America/Chicago"))
+    bench("is_valid_timezone/invalid", lambda: citytime.is_valid_timezone("Mars/Olympus_Mons"))
+    bench("find_timezone_matches/exact", lambda: citytime.find_timezone_matches("chicago"))
+    bench("find_timezone_matches/substring", lambda: citytime.find_timezone_matches("york"))
+    bench("find_timezone_matches/fuzzy-miss", lambda: citytime.find_timezone_matches("qzxvbnmw"))
+    bench("resolve_city/cached", lambda: citytime.resolve_city("londn"))
+    offices = [tz for tz in citytime.TZ_REGISTRY.sorted() if tz.startswith(("Europe/", "America/", "Africa/"))][:100]
+    bench("plan_overlap/100-zones-year", lambda: citytime.plan_overlap(
+        offices, datetime.date(2026, 1, 1), datetime.date(2026, 12, 31), "07:00-19:00", min_cities=60))
+
+    counter = iter(range(10**9))
+    bench("save_alias", lambda: citytime.save_alias(f"benchsave{next(counter)}", "Europe/Paris"))
+    citytime.ALIAS_STORE.compact()
+
+    def quiet_update() -> None:
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        try:
+            citytime.update_aliases_from_api()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    bench("update_aliases_from_api/fresh", quiet_update, setup=lambda: write_aliases(0), min_runs=3)
+    write_aliases(20)
+
+
+def bench_web(bench: Bench) -> None:
+    """Every Flask endpoint through the test client (skipped without Flask)."""
+    try:
+        import citytime_web
+    except ImportError as e:
+        print(f"⏭️ Skipping web benchmarks: {e}")
+        return
+    # Never touch the network: serve a fixed headline list and keep the refresher idle
+    feed = citytime_web.HEADLINES
+    feed.fetch = lambda: [{"title": f"Headline {i}", "url": f"https://example.com/{i}"} for i in range(6)]
+    feed.refresh()
+    feed.start = lambda: None
+    client = citytime_web.app.test_client()
+
+    def get(path: str, status: int = 200, **kwargs):
+        def call():
+            response = client.get(path, **kwargs)
+            assert response.status_code == status, (path, response.status_code)
+        return call
+
+    def post(path: str, body, status: int = 200):
+        def call():
+            response = client.post(path, json=body)
+            assert response.status_code == status, (path, response.status_code)
+        return call
+
+    cities = ["chicago", "london", "tokyo", "paris", "sydney", "new york", "berlin", "mumbai"]
+    aliases_etag = client.get("/api/aliases").headers["ETag"]
+    bench("web/index", get("/"))
+    bench("web/time", get("/api/time/chicago"))
+    bench("web/times", post("/api/times", {"cities": cities}))
+    bench("web/schedule", get("/api/schedule/Europe/Paris"))
+    bench("web/schedules", post("/api/schedules", {"zones": ["Europe/Paris", "America/Chicago", "Asia/Tokyo"]}))
+    try:
+        import numpy  # noqa: F401
+        bench("web/convert", post("/api/convert", {"timestamps": list(range(0, 10**9, 10**6)),
+                                                   "zones": "America/Chicago"}))
+    except ImportError:
+        print("⏭️ Skipping web/convert: NumPy not installed")
+    bench("web/aliases", get("/api/aliases"))
+    bench("web/aliases-304", get("/api/aliases", 304, headers={"If-None-Match": aliases_etag}))
+    bench("web/aliases-add-delete", lambda: (post("/api/aliases", {"city": "benchweb", "timezone": "Europe/Oslo"})(),
+                                             client.delete("/api/aliases/benchweb")))
+    bench("web/aliases-bulk", post("/api/aliases/bulk", {"aliases": {"benchbulk": "Europe/Rome"},
+                                                         "remove": ["benchbulk"]}))
+    bench("web/search", get("/api/search/new"))
+    bench("web/timezones", get("/api/timezones"))
+    bench("web/timezones-gzip", get("/api/timezones", headers={"Accept-Encoding": "gzip"}))
+    bench("web/headlines", get("/api/headlines"))
+    bench("web/stats", get("/api/stats"))
+
+
+def run_benchmarks(name_filter: str = "", min_time: float = 0.3, baseline_file: Path = BASELINE_FILE,
+                   threshold: float = RUN_THRESHOLD, update: bool = False, output: Path = OUTPUT_FILE) -> bool:
+    """Run the suite in a temporary HOME and compare ops/sec against the stored baselines."""
+    bench = Bench(min_time=min_time, name_filter=name_filter)
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        os.environ["CITYTIME_HEADLINES_URL"] = "http://127.0.0.1:9/"
+        sys.path.insert(0, str(ROOT))
+        bench_core(bench, home)
+        bench_web(bench)
+    baselines = json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+    stored = baselines.setdefault("benchmarks", {})
+    lines = []
+    compared = []
+    ok = True
+    for name, result in bench.results.items():
+        line = f"{name:<44} {result['ops_per_sec']:>12,.0f} ops/s  p50 {result['p50_us']:.1f}us  " \
+               f"p90 {result['p90_us']:.1f}us  p99 {result['p99_us']:.1f}us"
+        base = stored.get(name)
+        if base and not update:
+            change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+            line += f"  ({change:+.0%} vs baseline)"
+            if change < -threshold:
+                line += "  ❌ REGRESSION"
+                ok = False
+            compared.append(f"{name:<44} {change:+6.0%}" + ("  ❌ REGRESSION" if change < -threshold else ""))
+        lines.append(line)
+    output.write_text("\n".join(lines) + "\n")
+    if compared:
+        print(f"\nChange in ops/sec vs {baseline_file.name}:")
+        print("\n".join(compared))
+    if update:
+        for name, result in bench.results.items():
+            stored[name] = {key: round(value, 1) for key, value in result.items()}
+        baseline_file.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"✅ Baselines updated for {len(bench.results)} benchmarks")
+    elif not ok:
+        print(f"❌ Throughput regressed more than {threshold:.0%} against {baseline_file.name}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="citytime performance checks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Microbenchmarks for the alias, resolution and web hot paths")
+    run.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    run.add_argument("--min-time", type=float, default=0.3, help="Seconds to spend per benchmark")
+    run.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    run.add_argument("--threshold", type=float, default=RUN_THRESHOLD,
+                     help="Allowed fractional drop in ops/sec before failing (default 0.3)")
+    run.add_argument("--update-baseline", action="store_true")
+    run.add_argument("--output", type=Path, default=OUTPUT_FILE)
+    imp = sub.add_parser("importtime", help="Track `import citytime` cost with -X importtime")
+    imp.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    imp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                     help="Allowed fractional slowdown before failing (default 0.5; timings are noisy)")
+    imp.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return 0 if run_benchmarks(args.filter, args.min_time, args.baseline, args.threshold,
+                                   args.update_baseline, args.output) else 1
+    if args.command == "importtime":
+        return 0 if check_import_time(args.baseline, args.threshold, args.update_baseline) else 1
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
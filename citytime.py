@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
+import heapq
+import mmap
 import os
+import struct
 import sys
-from pathlib import Path
-from datetime import datetime
-from typing import Dict, Optional, List, Tuple
-from difflib import SequenceMatcher
+import threading
+import time
+import zoneinfo
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+from collections import OrderedDict, deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, FrozenSet, NamedTuple, Optional, List, Set, Tuple
 from zoneinfo import ZoneInfo, available_timezones
 # Configuration
-HOME = Path.home()
-ALIAS_FILE = HOME / ".citytime_aliases"
-# Initialize files
-ALIAS_FILE.touch(exist_ok=True)
+HOME = os.path.expanduser("~")
+ALIAS_FILE = os.path.join(HOME, ".citytime_aliases")
+ALIAS_DB = os.path.join(HOME, ".citytime_aliases.db")
 # Default US city aliases
 DEFAULT_ALIASES = {
     "newyork": "America/New_York",
@@ -245,47 +252,873 @@ STATE_TIMEZONES = {
     "vt": ["America/New_York"], "va": ["America/New_York"], "wa": ["America/Los_Angeles"], "wv": ["America/New_York"],
     "wi": ["America/Chicago"], "wy": ["America/Denver"],
 }
-def load_aliases() -> Dict[str, str]:
-    """Load aliases from file and merge with defaults and city database."""
-    aliases = CITY_DATABASE.copy()
-    aliases.update(DEFAULT_ALIASES)
-    if ALIAS_FILE.exists():
-        with open(ALIAS_FILE, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if '=' in line:
+_CANONICAL = str.maketrans('', '', '-_ .')
+def canonical_name(name: str) -> str:
+    """Lower-case a name and strip separators (- _ space .) in a single translate pass."""
+    return name.lower().translate(_CANONICAL)
+@lru_cache(maxsize=None)
+def _city_lookup() -> Dict[str, str]:
+    """CITY_DATABASE keyed by canonical name, built once."""
+    return {canonical_name(k): tz for k, tz in CITY_DATABASE.items()}
+@lru_cache(maxsize=None)
+def _country_lookup() -> Dict[str, List[str]]:
+    """COUNTRY_TIMEZONES keyed by canonical name, built once."""
+    return {canonical_name(k): tzs for k, tzs in COUNTRY_TIMEZONES.items()}
+@lru_cache(maxsize=None)
+def _state_lookup() -> Dict[str, List[str]]:
+    """STATE_TIMEZONES keyed by canonical name, built once."""
+    return {canonical_name(k): tzs for k, tzs in STATE_TIMEZONES.items()}
+@lru_cache(maxsize=None)
+def _tz_patterns() -> tuple:
+    """Compiled (rule, time) patterns for POSIX TZ strings; re is only imported when a footer is parsed."""
+    import re
+    rule = re.compile(
+        r"(?P<std>[^<0-9:.+-]+|<[a-zA-Z0-9+-]+>)"
+        r"(?:(?P<stdoff>[+-]?\d{1,3}(?::\d{2}(?::\d{2})?)?)"
+        r"(?:(?P<dst>[^0-9:.+-]+|<[a-zA-Z0-9+-]+>)(?P<dstoff>[+-]?\d{1,3}(?::\d{2}(?::\d{2})?)?)?)?)?",
+        re.ASCII)
+    return rule, re.compile(r"([+-])?(\d{1,3})(?::(\d{2})(?::(\d{2}))?)?", re.ASCII)
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+def _tz_seconds(text: str) -> int:
+    """Parse [+-]hh[:mm[:ss]] as signed seconds."""
+    m = _tz_patterns()[1].fullmatch(text)
+    if m is None:
+        raise ValueError(f"Invalid TZ time: {text}")
+    seconds = int(m.group(2)) * 3600 + int(m.group(3) or 0) * 60 + int(m.group(4) or 0)
+    return -seconds if m.group(1) == '-' else seconds
+class _TZRule:
+    """POSIX TZ footer rule (std[offset[dst[offset][,start[/time],end[/time]]]]) evaluated like zoneinfo."""
+    def __init__(self, text: str):
+        spec, _, dates = text.partition(',')
+        m = _tz_patterns()[0].fullmatch(spec)
+        if m is None:
+            raise ValueError(f"Invalid TZ string: {text}")
+        self.std_abbr = m.group('std').strip('<>')
+        self.std_off = -_tz_seconds(m.group('stdoff')) if m.group('stdoff') else 0
+        self.dst_abbr = m.group('dst').strip('<>') if m.group('dst') else None
+        if self.dst_abbr is None:
+            self.dst_off = self.std_off
+            self.start = self.end = None
+            return
+        self.dst_off = -_tz_seconds(m.group('dstoff')) if m.group('dstoff') else self.std_off + 3600
+        start, _, end = dates.partition(',')
+        if not start or not end:
+            raise ValueError(f"Missing transition rules: {text}")
+        self.start, self.end = self._parse_date(start), self._parse_date(end)
+    @staticmethod
+    def _parse_date(text: str) -> tuple:
+        date, _, at = text.partition('/')
+        seconds = _tz_seconds(at) if at else 7200
+        if date.startswith('M'):
+            month, week, day = (int(x) for x in date[1:].split('.'))
+            return ('M', month, week, day, seconds)
+        if date.startswith('J'):
+            return ('J', int(date[1:]), 0, 0, seconds)
+        return ('N', int(date), 0, 0, seconds)
+    @staticmethod
+    def _local_epoch(rule: tuple, year: int) -> int:
+        kind, a, week, day, seconds = rule
+        jan1 = datetime(year, 1, 1).toordinal() - _EPOCH_ORDINAL
+        if kind == 'M':
+            first = datetime(year, a, 1)
+            days_in_month = (datetime(year + a // 12, a % 12 + 1, 1) - first).days
+            month_day = (day - (first.weekday() + 1)) % 7 + 1 + (week - 1) * 7
+            if month_day > days_in_month:
+                month_day -= 7
+            days = first.toordinal() - _EPOCH_ORDINAL + month_day - 1
+        elif kind == 'J':
+            leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+            days = jan1 + a - 1 + (1 if leap and a >= 60 else 0)
+        else:
+            days = jan1 + a
+        return days * 86400 + seconds
+    def dst_window(self, year: int) -> Tuple[int, int]:
+        """UTC [start, end) of DST for a year, as zoneinfo computes it."""
+        return (self._local_epoch(self.start, year) - self.std_off,
+                self._local_epoch(self.end, year) - self.dst_off)
+    def state_at(self, epoch: int) -> Tuple[int, str, bool]:
+        if self.start is None:
+            return self.std_off, self.std_abbr, False
+        start, end = self.dst_window(datetime.fromtimestamp(epoch, timezone.utc).year)
+        isdst = start <= epoch < end if start < end else not (end <= epoch < start)
+        return (self.dst_off, self.dst_abbr, self.dst_off != self.std_off) if isdst else (self.std_off, self.std_abbr, False)
+    def candidates(self, start_epoch: int, end_epoch: int) -> List[int]:
+        """Instants in (start_epoch, end_epoch] where the rule's state may change."""
+        if self.start is None:
+            return []
+        first = datetime.fromtimestamp(start_epoch, timezone.utc).year
+        last = datetime.fromtimestamp(end_epoch, timezone.utc).year
+        points = set()
+        for year in range(first, last + 1):
+            points.update(self.dst_window(year))
+            points.add((datetime(year, 1, 1).toordinal() - _EPOCH_ORDINAL) * 86400)
+        return sorted(p for p in points if start_epoch < p <= end_epoch)
+class TZifData:
+    """A TZif (v1/v2/v3) zone file mapped into memory, with its tables exposed as compact buffers.
+
+    The file is memory-mapped where the mmap does not pin a file descriptor (Python
+    3.13+), otherwise read once into a single bytes buffer. trans_types and raw_times
+    are zero-copy memoryviews into that buffer; transitions is the one decoded copy
+    (TZif stores big-endian times), an array('q') of UTC epochs. Types are indexed
+    into utoffs (array('l')), isdst (array('b')) and abbrs. Instants past the last
+    transition follow the footer TZ rule, matching zoneinfo.ZoneInfo.
+    """
+    def __init__(self, buffer, key: str = ""):
+        self.key = key
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if view[:4] != b"TZif":
+            raise ValueError(f"Invalid TZif file for {key!r}: magic not found")
+        self.version = 1 if view[4] == 0 else int(chr(view[4]))
+        counts = struct.unpack_from(">6l", view, 20)
+        pos, time_size = 44, 4
+        if self.version >= 2:
+            isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt = counts
+            pos += timecnt * 5 + typecnt * 6 + charcnt + leapcnt * 8 + isstdcnt + isutcnt
+            counts = struct.unpack_from(">6l", view, pos + 20)
+            pos, time_size = pos + 44, 8
+        isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt = counts
+        self.raw_times = view[pos:pos + timecnt * time_size]
+        pos += timecnt * time_size
+        self.trans_types = view[pos:pos + timecnt]
+        pos += timecnt
+        if time_size == 8:
+            self.transitions = array('q')
+            self.transitions.frombytes(self.raw_times)
+            if sys.byteorder == 'little':
+                self.transitions.byteswap()
+        else:
+            self.transitions = array('q', struct.unpack(f">{timecnt}l", self.raw_times))
+        types = [struct.unpack_from(">lbB", view, pos + 6 * i) for i in range(typecnt)]
+        pos += typecnt * 6
+        chars = bytes(view[pos:pos + charcnt])
+        pos += charcnt + leapcnt * (time_size + 4) + isstdcnt + isutcnt
+        self.utoffs = array('l', (t[0] for t in types))
+        self.isdst = array('b', (t[1] for t in types))
+        self.abbrs = [chars[t[2]:chars.index(b"\0", t[2])].decode() for t in types]
+        self.rule: Optional[_TZRule] = None
+        if self.version >= 2 and view[pos:pos + 1] == b"\n":
+            footer = bytes(view[pos + 1:view.nbytes]).split(b"\n", 1)[0]
+            if footer:
+                self.rule = _TZRule(footer.decode())
+        # zoneinfo uses the first non-DST type before the first transition
+        self.before = next((i for i, dst in enumerate(self.isdst) if not dst), self.trans_types[0] if timecnt else 0)
+    @classmethod
+    def load(cls, key: str) -> "TZifData":
+        """Locate key on TZPATH (or in the tzdata package) and map it."""
+        for root in zoneinfo.TZPATH:
+            path = os.path.join(root, key)
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    if sys.version_info >= (3, 13):
+                        return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ, trackfd=False), key)
+                    return cls(f.read(), key)
+        from importlib import resources
+        package, _, name = ("tzdata.zoneinfo." + key.replace('/', '.')).rpartition('.')
+        try:
+            return cls(resources.files(package).joinpath(name).read_bytes(), key)
+        except (ImportError, FileNotFoundError) as e:
+            raise zoneinfo.ZoneInfoNotFoundError(f"No time zone found with key {key}") from e
+    def _type_state(self, i: int) -> Tuple[int, str, bool]:
+        return self.utoffs[i], self.abbrs[i], bool(self.isdst[i])
+    def state_at(self, epoch: int) -> Tuple[int, str, bool]:
+        """(UTC offset seconds, abbreviation, is DST) in force at a UTC epoch second."""
+        times = self.transitions
+        if times and epoch < times[0]:
+            return self._type_state(self.before)
+        if (not times or epoch > times[-1]) and self.rule is not None:
+            return self.rule.state_at(epoch)
+        if not times:
+            return self._type_state(self.before)
+        return self._type_state(self.trans_types[bisect_right(times, epoch) - 1])
+    def transitions_between(self, start_epoch: int, end_epoch: int) -> List[Tuple[int, int, str, bool]]:
+        """(epoch, offset, abbreviation, is DST) for every state change in (start_epoch, end_epoch]."""
+        out = []
+        state = self.state_at(start_epoch)
+        times = self.transitions
+        i = bisect_right(times, start_epoch)
+        points = list(times[i:bisect_right(times, end_epoch)])
+        if self.rule is not None:
+            points.extend(self.rule.candidates(max(start_epoch, times[-1] if times else start_epoch), end_epoch))
+        for epoch in points:
+            new_state = self.state_at(epoch)
+            if new_state != state:
+                out.append((epoch,) + new_state)
+                state = new_state
+        return out
+class TimezoneRegistry:
+    """Process-wide cache of the system zone set, reloaded only when tzdata changes."""
+    CHECK_INTERVAL = 30.0
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._zones: FrozenSet[str] = frozenset()
+        self._sorted: List[str] = []
+        self._zones_version = -1
+        self._probed: Set[str] = set()
+        self._stamp: Optional[tuple] = None
+        self._checked = 0.0
+        self._tzif: Dict[str, TZifData] = {}
+        self._zoneinfo: Dict[str, ZoneInfo] = {}
+        self.version = 0
+    @staticmethod
+    def _signature() -> tuple:
+        """Cheap fingerprint of the tz database: TZPATH mtimes plus the installed tzdata package."""
+        parts = []
+        for root in zoneinfo.TZPATH:
+            for name in ('', 'tzdata.zi'):
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                parts.append((root, name, st.st_mtime_ns))
+        # Stat the tzdata package rather than importing importlib.metadata (~50 ms) for its version
+        from importlib.util import find_spec
+        spec = find_spec('tzdata')
+        if spec is not None and spec.origin:
+            try:
+                parts.append(('tzdata', spec.origin, os.stat(spec.origin).st_mtime_ns))
+            except OSError:
+                pass
+        return tuple(parts)
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._stamp is not None and now - self._checked < self.CHECK_INTERVAL:
+            return
+        with self._lock:
+            if self._stamp is not None and now - self._checked < self.CHECK_INTERVAL:
+                return
+            stamp = self._signature()
+            if stamp != self._stamp:
+                if self.version:
+                    # Do not let ZoneInfo's own cache hand back zones built from the old data
+                    ZoneInfo.clear_cache()
+                self._stamp = stamp
+                self._tzif = {}
+                self._zoneinfo = {}
+                self._probed = set()
+                self.version += 1
+            self._checked = now
+    def _load_zones(self) -> None:
+        """Scan the zone set (available_timezones() opens every file) once per version."""
+        self._refresh()
+        if self._zones_version == self.version:
+            return
+        with self._lock:
+            version = self.version
+            if self._zones_version != version:
+                zones = available_timezones()
+                self._zones = frozenset(zones)
+                self._sorted = sorted(zones)
+                self._zones_version = version
+    @staticmethod
+    def _is_zone_file(tz: str) -> bool:
+        """True if tz names a TZif file that available_timezones() would list, without scanning."""
+        parts = tz.split('/')
+        if (not tz or tz == 'posixrules' or parts[0] in ('right', 'posix') or '\\' in tz
+                or any(part in ('', '.', '..') for part in parts)):
+            return False
+        for root in zoneinfo.TZPATH:
+            path = os.path.join(root, tz)
+            directory = os.path.dirname(path)
+            # os.walk does not follow symlinked subdirectories, so neither may we
+            if os.path.realpath(directory) != os.path.join(os.path.realpath(root), *parts[:-1]):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    if f.read(4) == b"TZif":
+                        return True
+            except OSError:
+                continue
+        return False
+    def invalidate(self) -> None:
+        """Force the next access to re-check the tz database."""
+        with self._lock:
+            self._stamp = None
+    def __contains__(self, tz: str) -> bool:
+        self._refresh()
+        if self._zones_version != self.version:
+            if tz in self._probed:
+                return True
+            if self._is_zone_file(tz):
+                self._probed.add(tz)
+                return True
+        self._load_zones()
+        return tz in self._zones
+    def __len__(self) -> int:
+        self._load_zones()
+        return len(self._zones)
+    def zones(self) -> FrozenSet[str]:
+        """Return the current zone set."""
+        self._load_zones()
+        return self._zones
+    def sorted(self) -> List[str]:
+        """Return the pre-sorted zone list (shared; do not mutate)."""
+        self._load_zones()
+        return self._sorted
+    def current_version(self) -> int:
+        """Return the registry version, bumped on every reload."""
+        self._refresh()
+        return self.version
+    def tzif(self, tz: str) -> TZifData:
+        """Return the mapped TZif tables for tz, loaded once per registry version."""
+        self._refresh()
+        data = self._tzif.get(tz)
+        if data is None:
+            if tz not in self:
+                raise zoneinfo.ZoneInfoNotFoundError(f"No time zone found with key {tz}")
+            data = self._tzif.setdefault(tz, TZifData.load(tz))
+        return data
+    def zoneinfo(self, tz: str) -> ZoneInfo:
+        """Return the ZoneInfo for tz, pinned for this registry version (ZoneInfo's own LRU keeps only 8)."""
+        self._refresh()
+        zone = self._zoneinfo.get(tz)
+        if zone is None:
+            zone = self._zoneinfo.setdefault(tz, ZoneInfo(tz))
+        return zone
+TZ_REGISTRY = TimezoneRegistry()
+class _FileLock:
+    """Exclusive advisory lock (fcntl.flock) held on a file for the duration of a with block.
+
+    A no-op where fcntl is unavailable; in-process writers are serialized by AliasStore's lock.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+    def __enter__(self) -> "_FileLock":
+        try:
+            import fcntl
+        except ImportError:
+            return self
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+    def __exit__(self, *exc) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+class FileAliasBackend:
+    """User aliases in an append-only ``key=value`` journal.
+
+    A put appends ``key=value`` and a delete appends the tombstone ``key=`` (lines that
+    older versions already ignored). Replay is last-write-wins; compact() rewrites the
+    file as one line per live alias through a unique temp file.
+
+    Writers hold an advisory lock on the ``.gen`` sidecar and bump the 8-byte
+    generation counter in it. Readers keep the sidecar memory-mapped, so noticing
+    another process's write costs one read of shared memory plus the journal stat.
+    """
+    indexed = False
+    GENERATION = struct.Struct('<Q')
+    def __init__(self, path: str):
+        self.path = path
+        self.gen_path = path + '.gen'
+        self._gen: Optional[mmap.mmap] = None
+        self._unmapped_at: Optional[tuple] = None
+    def _map_generation(self, create: bool = False) -> Optional[mmap.mmap]:
+        if self._gen is None:
+            try:
+                fd = os.open(self.gen_path, os.O_RDWR | (os.O_CREAT if create else 0), 0o644)
+            except OSError:
+                return None
+            try:
+                if os.fstat(fd).st_size < self.GENERATION.size:
+                    os.ftruncate(fd, self.GENERATION.size)
+                self._gen = mmap.mmap(fd, self.GENERATION.size)
+            finally:
+                os.close(fd)
+        return self._gen
+    def generation(self) -> int:
+        """Number of writes any process has made through this backend (0 before the first)."""
+        gen = self._map_generation()
+        return self.GENERATION.unpack_from(gen)[0] if gen is not None else 0
+    def _bump(self) -> Tuple[int, tuple]:
+        # Called with the lock held, so the stamp taken here is exactly our own write's
+        gen = self._map_generation(create=True)
+        before = self.GENERATION.unpack_from(gen)[0]
+        self.GENERATION.pack_into(gen, 0, before + 1)
+        return before, self.stamp()
+    def stamp(self) -> tuple:
+        """Cheap change detector: (generation, mtime, size, inode); the stat catches hand edits."""
+        try:
+            st = os.stat(self.path)
+            file_stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            file_stamp = ()
+        gen = self._gen
+        if gen is None and file_stamp != self._unmapped_at:
+            # The sidecar is created by the first write, which also changes the journal
+            gen = self._map_generation()
+            self._unmapped_at = file_stamp
+        return (self.GENERATION.unpack_from(gen)[0] if gen is not None else 0,) + file_stamp
+    def load(self) -> Tuple[Dict[str, str], int]:
+        """Replay the journal, returning live user aliases and the number of dead lines."""
+        user = {}
+        records = 0
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if '=' not in line:
+                        continue
                     key, value = line.split('=', 1)
-                    if key and value:
-                        aliases[key] = value
-    return aliases
+                    if not key:
+                        continue
+                    records += 1
+                    if value:
+                        user[key] = value
+                    else:
+                        user.pop(key, None)
+        except FileNotFoundError:
+            pass
+        return user, records - len(user)
+    def write(self, records: List[Tuple[str, str]]) -> Tuple[int, tuple]:
+        """Append records (an empty value deletes) under the lock; returns the generation before and the stamp after."""
+        data = ''.join(f"{key}={value}\n" for key, value in records).encode()
+        with _FileLock(self.gen_path):
+            with open(self.path, 'ab+') as f:
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b'\n':
+                        data = b'\n' + data
+                f.write(data)
+            return self._bump()
+    def compact(self) -> Tuple[int, tuple]:
+        """Rewrite the journal from a fresh replay under the lock, so no other process's appends are lost."""
+        import tempfile
+        with _FileLock(self.gen_path):
+            user, _ = self.load()
+            directory, name = os.path.split(os.path.abspath(self.path))
+            fd, temp_file = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.writelines(f"{key}={value}\n" for key, value in user.items())
+                try:
+                    os.chmod(temp_file, os.stat(self.path).st_mode & 0o777)
+                except FileNotFoundError:
+                    pass
+                os.replace(temp_file, self.path)
+            except BaseException:
+                try:
+                    os.unlink(temp_file)
+                except FileNotFoundError:
+                    pass
+                raise
+            return self._bump()
+class SQLiteAliasBackend:
+    """User aliases in a SQLite database (WAL mode) with indexed lookups.
+
+    Keys are the primary key, so exact lookups and prefix scans use the table's
+    b-tree; a second index covers canonical_name(key) for separator-insensitive
+    search. Writes are batched upserts in one transaction, each bumping a generation
+    counter that other processes poll as their change stamp. A new database imports
+    legacy_path (the ``key=value`` file) once.
+    """
+    indexed = True
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS aliases (key TEXT PRIMARY KEY, value TEXT NOT NULL, norm TEXT NOT NULL)"
+        " WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS aliases_norm ON aliases (norm)",
+        "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID",
+        "INSERT OR IGNORE INTO meta VALUES ('generation', 0)",
+    )
+    def __init__(self, path: str, legacy_path: Optional[str] = None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+    def _db(self):
+        # Connections must not cross fork(); prefork workers each open their own
+        if self._conn is None or self._pid != os.getpid():
+            import sqlite3
+            fresh = not os.path.exists(self.path)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+            self._conn, self._pid = conn, os.getpid()
+            if fresh and self.legacy_path and os.path.exists(self.legacy_path):
+                self.write(list(FileAliasBackend(self.legacy_path).load()[0].items()))
+        return self._conn
+    def _generation(self) -> int:
+        return self._db().execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()[0]
+    def stamp(self) -> tuple:
+        """(generation,); the generation changes whenever any process commits aliases."""
+        with self._lock:
+            return (self._generation(),)
+    def load(self) -> Tuple[Dict[str, str], int]:
+        with self._lock:
+            return dict(self._db().execute("SELECT key, value FROM aliases")), 0
+    def write(self, records: List[Tuple[str, str]]) -> Tuple[int, tuple]:
+        """Upsert records (an empty value deletes) in one transaction; returns the generation before and the stamp after."""
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                before = self._generation()
+                conn.executemany("INSERT INTO aliases (key, value, norm) VALUES (?, ?, ?)"
+                                 " ON CONFLICT (key) DO UPDATE SET value = excluded.value, norm = excluded.norm",
+                                 [(key, value, canonical_name(key)) for key, value in records if value])
+                conn.executemany("DELETE FROM aliases WHERE key = ?", [(key,) for key, value in records if not value])
+                conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'generation'")
+            return before, (before + 1,)
+    def compact(self) -> Tuple[int, tuple]:
+        """Fold the write-ahead log back into the database file (the data, and so the generation, is unchanged)."""
+        with self._lock:
+            self._db().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            generation = self._generation()
+            return generation, (generation,)
+    def lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db().execute("SELECT value FROM aliases WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    def search(self, prefix: str) -> List[Tuple[str, str]]:
+        """Aliases whose key, or canonical key, starts with prefix."""
+        norm = canonical_name(prefix)
+        with self._lock:
+            return self._db().execute(
+                "SELECT key, value FROM aliases WHERE key >= ? AND key < ?"
+                " UNION SELECT key, value FROM aliases WHERE norm >= ? AND norm < ? ORDER BY key",
+                (prefix, prefix + '\U0010ffff', norm, norm + '\U0010ffff')).fetchall()
+class AliasStore:
+    """Long-lived merged alias mapping over a user-alias backend (FileAliasBackend or SQLiteAliasBackend).
+
+    The merged view is built-ins overlaid with the backend's aliases and is reloaded
+    when the backend's stamp changes. With the file journal, superseded lines are
+    compacted away once they pass COMPACT_MIN_DEAD and outnumber live ones. Indexed
+    backends answer lookup(), search() and writes without loading the whole set.
+    """
+    COMPACT_MIN_DEAD = 256
+    CHANGELOG_BATCHES = 64
+    CHANGELOG_MAX_BATCH = 1024
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.RLock()
+        self._merged: Dict[str, str] = {}
+        self._user: Dict[str, str] = {}
+        self._stamp = None
+        self._loaded = False
+        self._dead = 0
+        self._compactor: Optional[threading.Thread] = None
+        self._changelog: deque = deque()
+        self._changelog_floor = 0
+        self.version = 0
+        self.reloads = 0
+    def _refresh(self) -> None:
+        stamp = self.backend.stamp()
+        if self._loaded and stamp == self._stamp:
+            return
+        with self._lock:
+            stamp = self.backend.stamp()
+            if self._loaded and stamp == self._stamp:
+                return
+            user, dead = self.backend.load()
+            merged = CITY_DATABASE.copy()
+            merged.update(DEFAULT_ALIASES)
+            merged.update(user)
+            self._user, self._merged, self._dead = user, merged, dead
+            self._stamp = stamp
+            self._loaded = True
+            self.version += 1
+            self.reloads += 1
+            self._changelog.clear()
+            self._changelog_floor = self.version
+        self._maybe_compact()
+    def _lazy(self) -> bool:
+        """True if the backend can be queried directly and nothing has loaded the full mapping yet."""
+        return self.backend.indexed and not self._loaded
+    def _adopt(self, written: Tuple[int, tuple]) -> bool:
+        """After our own write, accept the stamp the backend took under its lock only if no other process wrote since our load.
+
+        Otherwise the old stamp is kept, so the next access reloads and sees both writes.
+        """
+        before, stamp = written
+        if self._stamp is None or self._stamp[0] != before:
+            return False
+        self._stamp = stamp
+        return True
+    def _write_through(self, records: List[Tuple[str, str]]) -> None:
+        """Write to an indexed backend without loading it; the next full load picks the change up."""
+        with self._lock:
+            self._adopt(self.backend.write(records))
+            self.version += 1
+            self._changelog.clear()
+            self._changelog_floor = self.version
+    def _append(self, records: List[Tuple[str, str]]) -> None:
+        self._adopt(self.backend.write(records))
+    def _builtin(self, key: str) -> Optional[str]:
+        return DEFAULT_ALIASES.get(key, CITY_DATABASE.get(key))
+    def put_many(self, records: Dict[str, str]) -> None:
+        """Record many aliases with a single append."""
+        self.update_many(records)
+    def delete_many(self, keys) -> List[str]:
+        """Tombstone user aliases with a single append; returns the keys actually removed."""
+        return self.update_many({}, keys)
+    def update_many(self, records: Dict[str, str], keys=()) -> List[str]:
+        """Record aliases and tombstone user aliases in one backend write (a key in both ends up removed).
+
+        Returns the keys actually removed.
+        """
+        if self._lazy():
+            removed = [key for key in dict.fromkeys(keys) if key in records or self.backend.lookup(key) is not None]
+            if records or removed:
+                self._write_through(list(records.items()) + [(key, '') for key in removed])
+            return removed
+        self._refresh()
+        with self._lock:
+            removed = [key for key in dict.fromkeys(keys) if key in records or key in self._user]
+            if not records and not removed:
+                return []
+            self._append(list(records.items()) + [(key, '') for key in removed])
+            self._dead += sum(1 for key in records if key in self._user) + 2 * len(removed)
+            user = dict(self._user)
+            user.update(records)
+            merged = dict(self._merged)
+            merged.update(records)
+            changes: Dict[str, Optional[str]] = dict(records)
+            for key in removed:
+                del user[key]
+                builtin = self._builtin(key)
+                if builtin is None:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = builtin
+                changes[key] = builtin
+            self._user, self._merged = user, merged
+            self.version += 1
+            self._log_changes(changes)
+        self._maybe_compact()
+        return removed
+    def _log_changes(self, changes: Dict[str, Optional[str]]) -> None:
+        """Remember a batch of merged-mapping changes (None = removed) for changes_since()."""
+        if len(changes) > self.CHANGELOG_MAX_BATCH:
+            self._changelog.clear()
+            self._changelog_floor = self.version
+            return
+        if len(self._changelog) >= self.CHANGELOG_BATCHES:
+            self._changelog_floor = self._changelog.popleft()[0]
+        self._changelog.append((self.version, changes))
+    def changes_since(self, version: int) -> Optional[Dict[str, Optional[str]]]:
+        """Merged-mapping changes after version (None = removed), or None if a full rebuild is needed."""
+        self._refresh()
+        with self._lock:
+            if version < self._changelog_floor:
+                return None
+            changes: Dict[str, Optional[str]] = {}
+            for batch_version, batch in self._changelog:
+                if batch_version > version:
+                    changes.update(batch)
+            return changes
+    def put(self, key: str, value: str) -> None:
+        """Record an alias with a single O(1) append."""
+        self.put_many({key: value})
+    def delete(self, key: str) -> bool:
+        """Tombstone a user alias; returns False if the key is not in ALIAS_FILE."""
+        return bool(self.delete_many([key]))
+    def compact(self) -> None:
+        """Drop superseded records (for the journal: rewrite as one ``key=value`` line per live alias)."""
+        with self._lock:
+            self._refresh()
+            if self._adopt(self.backend.compact()):
+                self._dead = 0
+    def _maybe_compact(self) -> None:
+        if self._dead < self.COMPACT_MIN_DEAD or self._dead <= len(self._user):
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="alias-compactor")
+            self._compactor.start()
+    def invalidate(self) -> None:
+        """Force a reload on next access (call after writing the alias file or database directly)."""
+        with self._lock:
+            self._loaded = False
+    def aliases(self) -> Dict[str, str]:
+        """Return the merged mapping (shared; do not mutate)."""
+        self._refresh()
+        return self._merged
+    def user_aliases(self) -> Dict[str, str]:
+        """Return only the aliases stored in the backend (shared; do not mutate)."""
+        self._refresh()
+        return self._user
+    def lookup(self, key: str) -> Optional[str]:
+        """Merged alias for key, from the backend's index while the full mapping is not loaded."""
+        if not self._lazy():
+            return self.aliases().get(key)
+        value = self.backend.lookup(key)
+        return value if value is not None else self._builtin(key)
+    def search(self, prefix: str) -> List[Tuple[str, str]]:
+        """Merged aliases whose key, or canonical key, starts with prefix, sorted by key."""
+        norm = canonical_name(prefix)
+        def matches(key: str) -> bool:
+            return key.startswith(prefix) or canonical_name(key).startswith(norm)
+        if not self._lazy():
+            return sorted((key, tz) for key, tz in self.aliases().items() if matches(key))
+        found = {key: tz for key, tz in CITY_DATABASE.items() if matches(key)}
+        found.update((key, tz) for key, tz in DEFAULT_ALIASES.items() if matches(key))
+        found.update(self.backend.search(prefix))
+        return sorted(found.items())
+    def current_version(self) -> int:
+        """Return the store version, bumped on every change; use it to key derived caches."""
+        if self._lazy():
+            stamp = self.backend.stamp()
+            if stamp != self._stamp:
+                with self._lock:
+                    self._stamp = stamp
+                    self.version += 1
+            return self.version
+        self._refresh()
+        return self.version
+def alias_backend():
+    """The user-alias backend chosen by CITYTIME_ALIAS_BACKEND: "file" (default, ALIAS_FILE) or "sqlite".
+
+    The SQLite database lives at CITYTIME_ALIAS_DB (default ~/.citytime_aliases.db) and
+    imports ALIAS_FILE when it is first created.
+    """
+    kind = os.environ.get("CITYTIME_ALIAS_BACKEND", "file").lower()
+    if kind == "sqlite":
+        return SQLiteAliasBackend(os.environ.get("CITYTIME_ALIAS_DB", ALIAS_DB), legacy_path=ALIAS_FILE)
+    if kind != "file":
+        raise ValueError(f"Unknown CITYTIME_ALIAS_BACKEND: {kind} (expected file or sqlite)")
+    return FileAliasBackend(ALIAS_FILE)
+ALIAS_STORE = AliasStore(alias_backend())
+def load_aliases() -> Dict[str, str]:
+    """Return aliases merged with defaults and city database (shared mapping; do not mutate)."""
+    return ALIAS_STORE.aliases()
 def save_alias(city: str, tz: str) -> None:
     """Save a single alias to file."""
-    city = city.lower()
-    lines = []
-    if ALIAS_FILE.exists():
-        with open(ALIAS_FILE, 'r') as f:
-            lines = [line for line in f if not line.startswith(f"{city}=")]
-    lines.append(f"{city}={tz}\n")
-    temp_file = ALIAS_FILE.with_suffix('.tmp')
-    with open(temp_file, 'w') as f:
-        f.writelines(lines)
-    temp_file.replace(ALIAS_FILE)
+    ALIAS_STORE.put(city.lower(), tz)
+def remove_alias(city: str) -> bool:
+    """Remove a user alias from file; returns False if it was not a user alias."""
+    return ALIAS_STORE.delete(city.lower())
+def update_aliases(mapping: Dict[str, str], remove=()) -> Tuple[int, List[str]]:
+    """Validate, save and remove aliases in one atomic write; raises ValueError and writes nothing if any entry is invalid.
+
+    Returns the number saved and the cities actually removed (a city both saved and removed ends up removed).
+    """
+    records = {city.lower(): tz for city, tz in mapping.items()}
+    if any(not city for city in records):
+        raise ValueError("Invalid city name")
+    invalid = sorted({tz for tz in records.values() if not is_valid_timezone(tz)})
+    if invalid:
+        raise ValueError(f"Invalid timezone(s): {', '.join(invalid)}")
+    return len(records), ALIAS_STORE.update_many(records, [city.lower() for city in remove])
+def save_aliases(mapping: Dict[str, str]) -> int:
+    """Validate and save many aliases in one write; raises ValueError and writes nothing if any entry is invalid."""
+    return update_aliases(mapping)[0]
+def remove_aliases(cities) -> List[str]:
+    """Remove many user aliases in one write; returns the cities actually removed."""
+    return ALIAS_STORE.delete_many(city.lower() for city in cities)
+class TypeaheadIndex:
+    """Prefix and substring search over alias names with bounded top-k ranking.
+
+    Names live in a sorted list for bisect prefix scans and in a 1- to 3-gram
+    postings map for the substring fallback, so queries of up to three characters
+    are answered by a single postings lookup. sync() applies the alias store's changelog
+    incrementally and only rebuilds from scratch after a full reload.
+    """
+    N = 3
+    EXACT, PREFIX, SUBSTRING = 1.0, 0.95, 0.9
+    def __init__(self, store: "AliasStore"):
+        self.store = store
+        self._lock = threading.Lock()
+        self._names: Dict[str, str] = {}
+        self._sorted: List[str] = []
+        self._postings: Dict[str, Set[str]] = {}
+        self.version: Optional[int] = None
+    def _grams(self, name: str) -> Set[str]:
+        return {name[j:j + n] for n in range(1, self.N + 1) for j in range(len(name) - n + 1)}
+    def _add(self, name: str, tz: str) -> None:
+        if name not in self._names:
+            insort(self._sorted, name)
+            for gram in self._grams(name):
+                self._postings.setdefault(gram, set()).add(name)
+        self._names[name] = tz
+    def _remove(self, name: str) -> None:
+        if self._names.pop(name, None) is None:
+            return
+        del self._sorted[bisect_left(self._sorted, name)]
+        for gram in self._grams(name):
+            names = self._postings.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._postings[gram]
+    def _rebuild(self, mapping: Dict[str, str]) -> None:
+        self._names = dict(mapping)
+        self._sorted = sorted(mapping)
+        postings: Dict[str, Set[str]] = {}
+        for name in self._sorted:
+            for gram in self._grams(name):
+                postings.setdefault(gram, set()).add(name)
+        self._postings = postings
+    def _sync(self) -> None:
+        version = self.store.current_version()
+        if version == self.version:
+            return
+        changes = self.store.changes_since(self.version) if self.version is not None else None
+        if changes is None:
+            self._rebuild(self.store.aliases())
+        else:
+            for name, tz in changes.items():
+                if tz is None:
+                    self._remove(name)
+                else:
+                    self._add(name, tz)
+        self.version = version
+    def _substring_matches(self, query: str, k: int) -> List[str]:
+        """First k names (alphabetically) containing but not starting with query."""
+        if len(query) <= self.N:
+            return heapq.nsmallest(k, (n for n in self._postings.get(query, ()) if not n.startswith(query)))
+        lists = sorted((self._postings.get(query[j:j + self.N], set()) for j in range(len(query) - self.N + 1)), key=len)
+        candidates = lists[0].intersection(*lists[1:]) if lists[0] else set()
+        return heapq.nsmallest(k, (n for n in candidates if query in n and not n.startswith(query)))
+    def search(self, query: str, limit: int = 15, offset: int = 0) -> List[Tuple[str, str, float]]:
+        """Return (name, timezone, score) for exact, then prefix, then substring matches."""
+        k = offset + limit
+        with self._lock:
+            self._sync()
+            results = []
+            if not query:
+                for name in self._sorted[:k]:
+                    results.append((name, self._names[name], self.SUBSTRING))
+                return results[offset:k]
+            if query in self._names:
+                results.append((query, self._names[query], self.EXACT))
+            i = bisect_left(self._sorted, query)
+            while len(results) < k and i < len(self._sorted) and self._sorted[i].startswith(query):
+                name = self._sorted[i]
+                if name != query:
+                    results.append((name, self._names[name], self.PREFIX))
+                i += 1
+            if len(results) < k:
+                for name in self._substring_matches(query, k - len(results)):
+                    results.append((name, self._names[name], self.SUBSTRING))
+            return results[offset:k]
+ALIAS_SEARCH = TypeaheadIndex(ALIAS_STORE)
+def search_aliases(query: str, limit: int = 15, offset: int = 0) -> List[Tuple[str, str, float]]:
+    """Typeahead search over alias and city names."""
+    return ALIAS_SEARCH.search(query.lower().strip(), limit, offset)
 def get_timezones_by_country(country: str, all_timezones: List[str]) -> List[str]:
     """Get timezones for a country, using COUNTRY_TIMEZONES mapping then falling back to string search."""
-    country_normalized = country.lower().replace(' ', '').replace('.', '').replace('-', '')
-    if country_normalized in COUNTRY_TIMEZONES:
-        return COUNTRY_TIMEZONES[country_normalized]
-    return [tz for tz in all_timezones if country.lower() in tz.lower()]
+    country_timezones = _country_lookup().get(canonical_name(country))
+    if country_timezones:
+        return country_timezones
+    needle = country.lower()
+    return [tz for tz in all_timezones if needle in tz.lower()]
 def fetch_valid_timezones(debug: bool = False) -> Optional[List[str]]:
     """Get valid timezones from the system's zoneinfo database."""
-    timezones = sorted(available_timezones())
+    timezones = TZ_REGISTRY.sorted()
     if debug:
         print(f"✅ Loaded {len(timezones)} timezones from system zoneinfo", file=sys.stderr)
     return timezones
 def get_timezone_by_state(state: str) -> Optional[str]:
     """Get timezone for a US state."""
-    state_normalized = state.lower().replace(' ', '').replace('.', '')
-    timezones = STATE_TIMEZONES.get(state_normalized, [])
+    timezones = _state_lookup().get(canonical_name(state), [])
     if not timezones:
         return None
     if len(timezones) > 1:
@@ -305,43 +1138,167 @@ def get_timezone_by_state(state: str) -> Optional[str]:
     return timezones[0]
 def similarity_score(city: str, timezone: str) -> float:
     """Calculate similarity score between city name and timezone."""
-    city_lower = city.lower().replace('-', '').replace('_', '').replace(' ', '').replace('.', '')
-    tz_city = os.path.basename(timezone).lower().replace('-', '').replace('_', '')
-    return SequenceMatcher(None, city_lower, tz_city).ratio()
+    from difflib import SequenceMatcher
+    return SequenceMatcher(None, canonical_name(city), canonical_name(os.path.basename(timezone))).ratio()
+class NgramIndex:
+    """Character n-gram inverted index over normalized keys for substring and fuzzy candidate lookup."""
+    N = 3
+    FUZZY_N = 2
+    def __init__(self, keys: List[str]):
+        self.keys = keys
+        self._by_key: Dict[str, List[int]] = {}
+        self._by_len: Dict[int, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._counts: List[Dict[str, int]] = []
+        self._longest = max(map(len, keys), default=0)
+        for i, key in enumerate(keys):
+            self._by_key.setdefault(key, []).append(i)
+            self._by_len.setdefault(len(key), []).append(i)
+            counts: Dict[str, int] = {}
+            for ch in key:
+                counts[ch] = counts.get(ch, 0) + 1
+            self._counts.append(counts)
+            grams = {key[j:j + n] for n in range(1, self.N + 1) for j in range(len(key) - n + 1)}
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+    def __len__(self) -> int:
+        return len(self.keys)
+    def exact(self, query: str) -> List[int]:
+        """Ids whose key equals the query."""
+        return self._by_key.get(query, [])
+    def containing(self, query: str) -> List[int]:
+        """Ids whose key contains the query as a substring."""
+        if not query:
+            return list(range(len(self.keys)))
+        if len(query) <= self.N:
+            return self._postings.get(query, [])
+        lists = [self._postings.get(query[j:j + self.N], []) for j in range(len(query) - self.N + 1)]
+        lists.sort(key=len)
+        if not lists[0]:
+            return []
+        candidates = set(lists[0])
+        for ids in lists[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                return []
+        return [i for i in candidates if query in self.keys[i]]
+    def contained_in(self, query: str) -> List[int]:
+        """Ids whose key is a substring of the query (may repeat ids for keys occurring more than once)."""
+        found = []
+        for j in range(len(query)):
+            for k in range(j + 1, min(len(query), j + self._longest) + 1):
+                found.extend(self._by_key.get(query[j:k], ()))
+        return found
+    def ratio(self, query: str, i: int) -> float:
+        """SequenceMatcher ratio between the query and key i."""
+        from difflib import SequenceMatcher
+        return SequenceMatcher(None, query, self.keys[i]).ratio()
+    def similar(self, query: str, threshold: float) -> List[Tuple[int, float]]:
+        """Ids whose SequenceMatcher ratio with the query is at least threshold.
+
+        Candidates are keys sharing a bigram with the query. A pair sharing no bigram
+        can only match in singletons, so 2M / (la + lb) <= 2M / (3M - 1); above a 2/3
+        threshold that caps la + lb, and keys short enough to hit the cap are added
+        too, which keeps the result identical to scoring every key.
+        """
+        n = min(self.FUZZY_N, len(query))
+        if not n:
+            return []
+        qlen = len(query)
+        candidates = set()
+        for j in range(qlen - n + 1):
+            candidates.update(self._postings.get(query[j:j + n], ()))
+        max_total = 2 / (3 * threshold - 2) if threshold > 2 / 3 else float('inf')
+        for length, ids in self._by_len.items():
+            if qlen + length <= max_total:
+                candidates.update(ids)
+        query_counts: Dict[str, int] = {}
+        for ch in query:
+            query_counts[ch] = query_counts.get(ch, 0) + 1
+        from difflib import SequenceMatcher
+        results = []
+        for i in candidates:
+            key = self.keys[i]
+            total = qlen + len(key)
+            if 2.0 * min(qlen, len(key)) < threshold * total:
+                continue
+            counts = self._counts[i]
+            overlap = sum(min(n, counts.get(ch, 0)) for ch, n in query_counts.items())
+            if 2.0 * overlap < threshold * total:
+                continue
+            score = SequenceMatcher(None, query, key).ratio()
+            if score >= threshold:
+                results.append((i, score))
+        return results
+_CITY_INDEX: Optional[Tuple[NgramIndex, List[str]]] = None
+_ZONE_INDEX: Optional[Tuple[int, NgramIndex, List[str]]] = None
+def _city_index() -> Tuple[NgramIndex, List[str]]:
+    """N-gram index over CITY_DATABASE keys, built on first use."""
+    global _CITY_INDEX
+    if _CITY_INDEX is None:
+        lookup = _city_lookup()
+        _CITY_INDEX = (NgramIndex(list(lookup)), list(lookup.values()))
+    return _CITY_INDEX
+def _zone_index() -> Tuple[NgramIndex, List[str]]:
+    """N-gram index over IANA zone basenames, rebuilt when the timezone registry reloads."""
+    global _ZONE_INDEX
+    timezones = TZ_REGISTRY.sorted()
+    if _ZONE_INDEX is None or _ZONE_INDEX[0] != TZ_REGISTRY.version:
+        keys = [canonical_name(tz.rpartition('/')[2]) for tz in timezones]
+        _ZONE_INDEX = (TZ_REGISTRY.version, NgramIndex(keys), timezones)
+    return _ZONE_INDEX[1], _ZONE_INDEX[2]
 def find_timezone_matches(city: str, debug: bool = False) -> List[Tuple[str, float]]:
     """Find timezone matches for a city name with similarity scores."""
-    city_normalized = city.lower().replace('-', '').replace('_', '').replace(' ', '').replace('.', '')
-    if city_normalized in CITY_DATABASE:
-        return [(CITY_DATABASE[city_normalized], 1.0)]
-    db_matches = []
-    for db_city, tz in CITY_DATABASE.items():
-        db_city_norm = db_city.lower().replace('-', '').replace('_', '').replace(' ', '').replace('.', '')
-        if city_normalized in db_city_norm or db_city_norm in city_normalized:
-            score = similarity_score(city, db_city)
-            db_matches.append((tz, score))
-    if db_matches:
-        unique_matches = {}
-        for tz, score in db_matches:
-            if tz not in unique_matches or unique_matches[tz] < score:
-                unique_matches[tz] = score
-        return sorted(unique_matches.items(), key=lambda x: x[1], reverse=True)
-    timezones = fetch_valid_timezones(debug=debug)
-    if not timezones:
+    return _match_city(city, debug)[1]
+STAGE_HOOK: Optional[Callable[[str, float], None]] = None
+def set_stage_hook(hook: Optional[Callable[[str, float], None]]) -> None:
+    """Install (or clear with None) a callback receiving (stage, seconds) for every resolution stage that runs."""
+    global STAGE_HOOK
+    STAGE_HOOK = hook
+def _run_stage(stage: str, fn: Callable, *args):
+    """Run one resolution stage, reporting its wall time to STAGE_HOOK when one is installed."""
+    hook = STAGE_HOOK
+    if hook is None:
+        return fn(*args)
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        hook(stage, time.perf_counter() - start)
+def _match_database(city_normalized: str) -> List[Tuple[str, float]]:
+    """City-database stage: exact key, else keys containing or contained in the query."""
+    exact = _city_lookup().get(city_normalized)
+    if exact:
+        return [(exact, 1.0)]
+    index, db_timezones = _city_index()
+    unique_matches = {}
+    for i in sorted(set(index.containing(city_normalized)).union(index.contained_in(city_normalized))):
+        tz = db_timezones[i]
+        score = index.ratio(city_normalized, i)
+        if tz not in unique_matches or unique_matches[tz] < score:
+            unique_matches[tz] = score
+    return sorted(unique_matches.items(), key=lambda x: x[1], reverse=True)
+def _match_fuzzy(city_normalized: str, debug: bool = False) -> List[Tuple[str, float]]:
+    """Fuzzy stage: score every IANA zone basename against the query."""
+    if not fetch_valid_timezones(debug=debug):
         return []
-    matches = []
-    for tz in timezones:
-        tz_city = os.path.basename(tz).lower().replace('-', '').replace('_', '')
-        if city_normalized == tz_city:
-            matches.append((tz, 1.0))
-        elif city_normalized in tz_city or tz_city in city_normalized:
-            score = similarity_score(city, tz)
-            matches.append((tz, score))
-        else:
-            score = similarity_score(city, tz)
-            if score >= 0.7:
-                matches.append((tz, score))
+    index, timezones = _zone_index()
+    scores = {i: 1.0 for i in index.exact(city_normalized)}
+    for i in set(index.containing(city_normalized)).union(index.contained_in(city_normalized)):
+        if i not in scores:
+            scores[i] = index.ratio(city_normalized, i)
+    for i, score in index.similar(city_normalized, 0.7):
+        scores.setdefault(i, score)
+    matches = [(timezones[i], scores[i]) for i in sorted(scores)]
     matches.sort(key=lambda x: x[1], reverse=True)
     return matches
+def _match_city(city: str, debug: bool = False) -> Tuple[str, List[Tuple[str, float]]]:
+    """Run find_timezone_matches, also reporting the stage that answered ("database" or "fuzzy")."""
+    city_normalized = canonical_name(city)
+    matches = _run_stage("database", _match_database, city_normalized)
+    if matches:
+        return "database", matches
+    return "fuzzy", _run_stage("fuzzy", _match_fuzzy, city_normalized, debug)
 def auto_match_timezone_with_context(city: str, debug: bool = False) -> Optional[str]:
     """Helper function to match timezone when automatic matching fails or is rejected."""
     print()
@@ -479,7 +1436,499 @@ def is_valid_timezone(tz: str) -> bool:
     """Validate timezone format and existence."""
     if '/' not in tz:
         return False
-    return tz in available_timezones()
+    return tz in TZ_REGISTRY
+class Resolution(NamedTuple):
+    """A resolved city: timezone, how it was found (alias, iana, database, fuzzy) and match score."""
+    timezone: str
+    kind: str
+    score: float
+FUZZY_ACCEPT_SCORE = 0.8
+def _resolve_alias(city_norm: str) -> Optional[Resolution]:
+    """Alias stage: user and default aliases, if they point at a real zone."""
+    tz = ALIAS_STORE.lookup(city_norm)
+    return Resolution(tz, "alias", 1.0) if tz and is_valid_timezone(tz) else None
+def _resolve_iana(city: str, city_norm: str) -> Optional[Resolution]:
+    """IANA stage: the query is itself a zone name, as typed or lowercased."""
+    for name in (city, city_norm):
+        if is_valid_timezone(name):
+            return Resolution(name, "iana", 1.0)
+    return None
+def _resolve_uncached(city: str, fuzzy: bool = True) -> Optional[Resolution]:
+    """Resolve a city without prompting: alias, then IANA name, then best match scoring at least FUZZY_ACCEPT_SCORE."""
+    city_norm = city.lower().strip()
+    resolved = _run_stage("alias", _resolve_alias, city_norm) or _run_stage("iana", _resolve_iana, city, city_norm)
+    if resolved or not fuzzy:
+        return resolved
+    kind, matches = _match_city(city_norm)
+    if matches and matches[0][1] >= FUZZY_ACCEPT_SCORE:
+        return Resolution(matches[0][0], kind, matches[0][1])
+    return None
+class ResolutionCache:
+    """Bounded LRU of query -> Resolution, dropped whenever the alias store or tz database version changes.
+
+    Misses (None) are cached too, but only for negative_ttl seconds.
+    """
+    def __init__(self, maxsize: int = 2048, negative_ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, bool], Tuple[Optional[Resolution], float]]" = OrderedDict()
+        self._versions: Optional[Tuple[int, int]] = None
+        self.hits = 0
+        self.misses = 0
+    def _check_versions(self) -> None:
+        versions = (ALIAS_STORE.current_version(), TZ_REGISTRY.current_version())
+        if versions != self._versions:
+            self._entries.clear()
+            self._versions = versions
+    def resolve(self, city: str, fuzzy: bool = True,
+                resolver: Callable[[str, bool], Optional[Resolution]] = _resolve_uncached) -> Optional[Resolution]:
+        """Return the cached resolution for city, computing and storing it on a miss."""
+        key = (city, fuzzy)
+        now = time.monotonic()
+        with self._lock:
+            self._check_versions()
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is not None or entry[1] > now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            versions = self._versions
+        result = resolver(city, fuzzy)
+        with self._lock:
+            if versions == self._versions:
+                self._entries[key] = (result, now + self.negative_ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                    "hit_ratio": self.hits / total if total else 0.0}
+RESOLUTION_CACHE = ResolutionCache()
+def resolve_city(city: str, fuzzy: bool = True) -> Optional[Resolution]:
+    """Resolve a city or timezone name without prompting, through the shared resolution cache."""
+    return RESOLUTION_CACHE.resolve(city, fuzzy)
+SCHEDULE_HORIZON_DAYS = 400
+SCHEDULE_MAX_TRANSITIONS = 50
+_SCHEDULE_CACHE: Dict[Tuple[str, int, int], Dict] = {}
+def warm_caches() -> None:
+    """Build the zone registry, TZif tables, alias store, lookup tables and match indexes up front.
+
+    Servers call this before forking workers so the built structures are shared copy-on-write.
+    """
+    for tz in TZ_REGISTRY.sorted():
+        TZ_REGISTRY.tzif(tz)
+    load_aliases()
+    _country_lookup()
+    _state_lookup()
+    _city_index()
+    _zone_index()
+    search_aliases("")
+def format_utc_offset(seconds: int) -> str:
+    """Format an offset in seconds as UTC+HH:MM (UTC when zero)."""
+    if not seconds:
+        return "UTC"
+    sign = '+' if seconds > 0 else '-'
+    hours, rem = divmod(abs(seconds), 3600)
+    return f"UTC{sign}{hours:02d}:{rem // 60:02d}"
+def _zone_state(tz: str, epoch: int) -> Tuple[int, str, bool]:
+    """(UTC offset seconds, abbreviation, is DST) in effect at a UTC epoch second."""
+    return TZ_REGISTRY.tzif(tz).state_at(epoch)
+def _transition_info(epoch: int, state: Tuple[int, str, bool]) -> Dict:
+    offset, abbr, dst = state
+    return {"epoch": epoch, "at": datetime.fromtimestamp(epoch, timezone.utc).isoformat(),
+            "offset_seconds": offset, "offset": format_utc_offset(offset), "abbr": abbr, "dst": dst}
+def zone_transitions(tz: str, start_epoch: int, count: int, horizon_days: int = SCHEDULE_HORIZON_DAYS) -> List[Dict]:
+    """Next transitions of tz after start_epoch, read from its TZif tables and footer rule."""
+    changes = TZ_REGISTRY.tzif(tz).transitions_between(start_epoch, start_epoch + horizon_days * 86400)
+    return [_transition_info(epoch, state) for epoch, *state in changes[:count]]
+def zone_schedule(tz: str, count: int = 4, now: Optional[float] = None) -> Dict:
+    """Current offset/abbreviation of tz plus its next transitions, valid until the first of them.
+
+    Clients can compute local time from this alone until valid_until; results are
+    cached per zone until then.
+    """
+    count = max(0, min(count, SCHEDULE_MAX_TRANSITIONS))
+    now_epoch = int(time.time() if now is None else now)
+    key = (tz, count, TZ_REGISTRY.current_version())
+    cached = _SCHEDULE_CACHE.get(key)
+    if cached is not None and cached["since"] <= now_epoch < cached["valid_until"]:
+        return cached
+    transitions = zone_transitions(tz, now_epoch, max(count, 1))
+    current = _transition_info(now_epoch, _zone_state(tz, now_epoch))
+    valid_until = transitions[0]["epoch"] if transitions else now_epoch + SCHEDULE_HORIZON_DAYS * 86400
+    schedule = {"timezone": tz, "since": now_epoch, "offset_seconds": current["offset_seconds"],
+                "offset": current["offset"], "abbr": current["abbr"], "dst": current["dst"],
+                "transitions": transitions[:count], "valid_until": valid_until,
+                "valid_until_iso": datetime.fromtimestamp(valid_until, timezone.utc).isoformat()}
+    if len(_SCHEDULE_CACHE) > 4096:
+        _SCHEDULE_CACHE.clear()
+    _SCHEDULE_CACHE[key] = schedule
+    return schedule
+WORK_WEEK = (0, 1, 2, 3, 4)
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+OVERLAP_MAX_CITIES = 200
+OVERLAP_MAX_DAYS = 400
+def parse_hours(text: str) -> Tuple[int, int]:
+    """Parse a working-hours window "HH:MM-HH:MM" into (start, end) seconds after local midnight.
+
+    An end at or before the start runs into the next day (e.g. "22:00-06:00").
+    """
+    if not isinstance(text, str):
+        raise ValueError(f"Invalid hours {text!r} (expected HH:MM-HH:MM)")
+    try:
+        start, end = (int(h) * 3600 + int(m) * 60 for h, m in (part.strip().split(':') for part in text.split('-')))
+    except ValueError:
+        raise ValueError(f"Invalid hours '{text}' (expected HH:MM-HH:MM)") from None
+    if not (0 <= start < 86400 and 0 <= end <= 86400) or start == end:
+        raise ValueError(f"Invalid hours '{text}' (expected HH:MM-HH:MM)")
+    return start, end if end > start else end + 86400
+def parse_weekdays(days) -> Tuple[int, ...]:
+    """Weekday numbers (Monday = 0) from ints, names ("mon") or a "mon-fri"/"mon,wed" string."""
+    if isinstance(days, str):
+        days = [part.strip() for part in days.split(',') if part.strip()]
+        expanded = []
+        for part in days:
+            first, sep, last = part.partition('-')
+            if sep:
+                a, b = parse_weekdays([first])[0], parse_weekdays([last])[0]
+                expanded.extend(range(a, b + 1) if a <= b else [*range(a, 7), *range(0, b + 1)])
+            else:
+                expanded.append(part)
+        days = expanded
+    out = set()
+    for day in days:
+        if isinstance(day, int) and 0 <= day < 7:
+            out.add(day)
+        elif isinstance(day, str) and day[:3].lower() in WEEKDAY_NAMES:
+            out.add(WEEKDAY_NAMES.index(day[:3].lower()))
+        else:
+            raise ValueError(f"Invalid weekday: {day!r}")
+    return tuple(sorted(out))
+_INTERVAL_CACHE: Dict[tuple, tuple] = {}
+def _working_intervals(tz: str, first_day: int, last_day: int, hours: Tuple[int, int],
+                       weekdays: FrozenSet[int]) -> tuple:
+    """UTC (start, end) of every working window in tz for local days first_day..last_day (days since 1970-01-01).
+
+    Walks the zone's offset transitions alongside the days, so each window costs O(1)
+    and DST changes shift it exactly where they occur. Results are memoized per tz data version.
+    """
+    key = (tz, first_day, last_day, hours, weekdays, TZ_REGISTRY.current_version())
+    cached = _INTERVAL_CACHE.get(key)
+    if cached is None:
+        if len(_INTERVAL_CACHE) > 4096:
+            _INTERVAL_CACHE.clear()
+        cached = _INTERVAL_CACHE[key] = tuple(_compute_intervals(tz, first_day, last_day, hours, weekdays))
+    return cached
+def _compute_intervals(tz: str, first_day: int, last_day: int, hours: Tuple[int, int],
+                       weekdays: FrozenSet[int]) -> List[Tuple[int, int]]:
+    tzif = TZ_REGISTRY.tzif(tz)
+    lo, hi = first_day * 86400 - 2 * 86400, (last_day + 2) * 86400 + hours[1]
+    times = [lo]
+    offsets = [tzif.state_at(lo)[0]]
+    for epoch, offset, _, _ in tzif.transitions_between(lo, hi):
+        if offset != offsets[-1]:
+            times.append(epoch)
+            offsets.append(offset)
+    last = len(times) - 1
+    out = []
+    j = 0
+    work_start, work_end = hours
+    for day in range(first_day, last_day + 1):
+        if (day + 3) % 7 not in weekdays:
+            continue
+        local = day * 86400 + work_start
+        # Advance to the offset in force at the UTC instant this wall time maps to
+        while j < last and local - offsets[j] >= times[j + 1] and local - offsets[j + 1] >= times[j + 1]:
+            j += 1
+        start = local - offsets[j]
+        local += work_end - work_start
+        k = j
+        while k < last and local - offsets[k] >= times[k + 1] and local - offsets[k + 1] >= times[k + 1]:
+            k += 1
+        end = local - offsets[k]
+        if end > start:
+            out.append((start, end))
+    return out
+def _format_local(epoch: int, offset: int) -> str:
+    return datetime.fromtimestamp(epoch + offset, timezone.utc).isoformat(timespec='minutes')[:16]
+def plan_overlap(cities: List[str], start: date, end: date, hours: str = "09:00-17:00",
+                 hours_by_city: Optional[Dict[str, str]] = None, weekdays=WORK_WEEK, min_minutes: int = 30,
+                 min_cities: Optional[int] = None, limit: int = 20) -> Dict:
+    """Rank the times between local dates start..end when the most cities are inside their working hours.
+
+    Cities are resolved like --time (aliases, IANA names, then best match). Each distinct
+    (zone, hours) group contributes its UTC working windows, and one sweep over the sorted
+    window boundaries yields every maximal slot where at least min_cities (default: all)
+    are available. Slots shorter than min_minutes are dropped; the rest are ranked by
+    attendance, then length, then start time. Raises ValueError for bad input or unknown cities.
+    """
+    if not cities:
+        raise ValueError("At least one city is required")
+    if len(cities) > OVERLAP_MAX_CITIES:
+        raise ValueError(f"At most {OVERLAP_MAX_CITIES} cities")
+    if end < start:
+        raise ValueError("end must not be before start")
+    if (end - start).days + 1 > OVERLAP_MAX_DAYS:
+        raise ValueError(f"At most {OVERLAP_MAX_DAYS} days")
+    hours_by_city = {city.lower().strip(): text for city, text in (hours_by_city or {}).items()}
+    default_hours = parse_hours(hours)
+    days = frozenset(parse_weekdays(weekdays))
+    need = len(cities) if min_cities is None else max(1, min(int(min_cities), len(cities)))
+    groups: Dict[Tuple[str, Tuple[int, int]], List[str]] = {}
+    participants = []
+    unresolved = []
+    for city in cities:
+        resolved = resolve_city(city) if isinstance(city, str) and city.strip() else None
+        if resolved is None:
+            unresolved.append(str(city))
+            continue
+        text = hours_by_city.get(city.lower().strip())
+        window = parse_hours(text) if text else default_hours
+        groups.setdefault((resolved.timezone, window), []).append(city)
+        participants.append({"city": city, "timezone": resolved.timezone,
+                             "hours": text or hours, "match": resolved.kind})
+    if unresolved:
+        raise ValueError(f"City not found: {', '.join(unresolved)}")
+    first_day = start.toordinal() - date(1970, 1, 1).toordinal()
+    last_day = end.toordinal() - date(1970, 1, 1).toordinal()
+    # Groups whose windows land on identical UTC intervals (e.g. every CET zone) share one
+    # weighted track, which keeps the sweep proportional to distinct schedules, not cities
+    tracks: Dict[tuple, int] = {}
+    weights: List[int] = []
+    track_of: Dict[str, int] = {}
+    for (tz, window), members in groups.items():
+        intervals = _working_intervals(tz, first_day, last_day, window, days)
+        g = tracks.setdefault(intervals, len(tracks))
+        if g == len(weights):
+            weights.append(0)
+        weights[g] += len(members)
+        for city in members:
+            track_of[city] = g
+    # Events encoded as ints (epoch, kind, track) so a plain sort orders them; ends sort
+    # before starts at the same instant, so back-to-back windows do not overlap
+    n = len(tracks)
+    span = 2 * n
+    events = []
+    for intervals, g in tracks.items():
+        for a, b in intervals:
+            events.append(a * span + n + g)
+            events.append(b * span + g)
+    events.sort()
+    slots = []
+    members = 0
+    attendance = 0
+    prev = None
+    for event in events:
+        epoch, g = divmod(event, span)
+        if attendance >= need and epoch > prev:
+            if slots and slots[-1][1] == prev and slots[-1][3] == members:
+                slots[-1][1] = epoch
+            else:
+                slots.append([prev, epoch, attendance, members])
+        if g >= n:
+            g -= n
+            attendance += weights[g]
+        else:
+            attendance -= weights[g]
+        members ^= 1 << g
+        prev = epoch
+    min_seconds = max(0, int(min_minutes)) * 60
+    slots = [slot for slot in slots if slot[1] - slot[0] >= min_seconds]
+    slots.sort(key=lambda slot: (-slot[2], slot[0] - slot[1], slot[0]))
+    ranked = []
+    for slot_start, slot_end, count, members in slots[:max(0, limit)]:
+        local = []
+        offsets: Dict[str, int] = {}
+        for participant in participants:
+            tz = participant["timezone"]
+            offset = offsets.get(tz)
+            if offset is None:
+                offset = offsets[tz] = _zone_state(tz, slot_start)[0]
+            local.append({"city": participant["city"], "timezone": tz,
+                          "available": bool(members >> track_of[participant["city"]] & 1),
+                          "start": _format_local(slot_start, offset), "end": _format_local(slot_end, offset),
+                          "offset": format_utc_offset(offset)})
+        ranked.append({"start": datetime.fromtimestamp(slot_start, timezone.utc).isoformat(),
+                       "end": datetime.fromtimestamp(slot_end, timezone.utc).isoformat(),
+                       "start_epoch": slot_start, "end_epoch": slot_end,
+                       "minutes": (slot_end - slot_start) // 60, "attendance": count,
+                       "missing": [entry["city"] for entry in local if not entry["available"]],
+                       "local": local})
+    return {"cities": participants, "start": start.isoformat(), "end": end.isoformat(),
+            "weekdays": [WEEKDAY_NAMES[d] for d in sorted(days)], "min_cities": need,
+            "total_slots": len(slots), "slots": ranked}
+_ZONE_TABLES: Dict[Tuple[str, int], tuple] = {}
+def _require_numpy():
+    """Import NumPy on demand; bulk conversion is the only feature that needs it."""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("NumPy is required for bulk conversion (pip install numpy)") from None
+    return numpy
+def zone_offset_table(tz: str, start_epoch: int, end_epoch: int) -> tuple:
+    """(transition epochs, offsets, dst flags) arrays covering [start_epoch, end_epoch].
+
+    offsets[0]/dst[0] are in force at start_epoch and offsets[i + 1]/dst[i + 1] from
+    transitions[i], so np.searchsorted(transitions, t, side='right') indexes them.
+    Tables are cached per zone and widened on demand.
+    """
+    np = _require_numpy()
+    key = (tz, TZ_REGISTRY.current_version())
+    cached = _ZONE_TABLES.get(key)
+    if cached is not None:
+        if cached[0] <= start_epoch and end_epoch <= cached[1]:
+            return cached[2:]
+        start_epoch, end_epoch = min(start_epoch, cached[0]), max(end_epoch, cached[1])
+    data = TZ_REGISTRY.tzif(tz)
+    first = data.state_at(start_epoch)
+    changes = data.transitions_between(start_epoch, end_epoch)
+    table = (
+        np.array([c[0] for c in changes], dtype=np.int64),
+        np.array([first[0]] + [c[1] for c in changes], dtype=np.int32),
+        np.array([first[2]] + [c[3] for c in changes], dtype=bool),
+    )
+    _ZONE_TABLES[key] = (start_epoch, end_epoch) + table
+    return table
+CONVERT_DAY_TABLE_MAX = 20_000_000
+# Epochs whose UTC and local wall times both stay inside datetime's years 1-9999 (a day of margin for offsets)
+CONVERT_EPOCH_MIN = -62135596800 + 86400
+CONVERT_EPOCH_MAX = 253402300799 - 86400
+def convert_timestamps(epochs, zones, codes=None) -> Dict[str, object]:
+    """Localize UTC epoch seconds in bulk with merged per-zone transition tables.
+
+    zones is one zone/city name, a sequence aligned with epochs, or (with codes) the
+    list of distinct names that the integer array codes indexes into; passing codes
+    skips per-row string handling entirely. Names are resolved like /api/time
+    (aliases, IANA names, fuzzy matches). Returns NumPy arrays local (datetime64[s]
+    wall time), offset (seconds), dst, valid (False where the name did not resolve)
+    and codes, plus zones, the resolved timezone (or None) for each code. Raises
+    ValueError for NaN, infinite or out-of-range (outside years 1-9999) epochs.
+    """
+    np = _require_numpy()
+    secs = np.asarray(epochs)
+    if secs.dtype.kind not in 'iu':
+        secs = np.floor(secs.astype(np.float64))
+        if not np.isfinite(secs).all():
+            raise ValueError("timestamps must be finite numbers")
+    if secs.size and (secs.min() < CONVERT_EPOCH_MIN or secs.max() > CONVERT_EPOCH_MAX):
+        raise ValueError(f"timestamps must be between {CONVERT_EPOCH_MIN} and {CONVERT_EPOCH_MAX} (years 1-9999)")
+    secs = secs.astype(np.int64)
+    n = secs.shape[0]
+    if isinstance(zones, str):
+        names, inverse = [zones], np.zeros(n, dtype=np.intp)
+    elif codes is not None:
+        names, inverse = list(zones), np.asarray(codes, dtype=np.intp)
+    else:
+        seen: Dict[str, int] = {}
+        inverse = np.fromiter((seen.setdefault(z, len(seen)) for z in zones), dtype=np.intp, count=n)
+        names = list(seen)
+    resolved_zones: List[Optional[str]] = [None] * len(names)
+    if not n:
+        empty = np.zeros(0, dtype=np.int32)
+        return {"zones": resolved_zones, "codes": inverse, "local": secs.view('datetime64[s]'),
+                "offset": empty, "dst": empty.astype(bool), "valid": empty.astype(bool)}
+    # One merged table for all zones: zone k's transitions are keyed k * span + (t - lo),
+    # each run headed by the state at lo, so every row is answered by one lookup.
+    lo, hi = int(secs.min()), int(secs.max())
+    span = 1 << 40
+    keys, zone_offsets, zone_dst = [], [], []
+    for k, name in enumerate(names):
+        resolved = resolve_city(name)
+        if resolved is None:
+            keys.append(np.array([k * span], dtype=np.int64))
+            zone_offsets.append(np.zeros(1, dtype=np.int32))
+            zone_dst.append(np.zeros(1, dtype=bool))
+            continue
+        resolved_zones[k] = resolved.timezone
+        transitions, offsets, dst = zone_offset_table(resolved.timezone, lo, hi)
+        first = np.searchsorted(transitions, lo, side='right')
+        keys.append(np.concatenate(([k * span], k * span + (transitions[first:] - lo))))
+        zone_offsets.append(offsets[first:])
+        zone_dst.append(dst[first:])
+    merged = np.concatenate(keys + [np.array([np.iinfo(np.int64).max], dtype=np.int64)])
+    query = inverse * span + (secs - lo)
+    days = (hi - lo) // 86400 + 1
+    if len(names) * days <= CONVERT_DAY_TABLE_MAX:
+        # Index of the state in force at each zone's day starts, then step over the
+        # (rare) transitions that fall inside a row's day.
+        starts = (np.arange(len(names), dtype=np.int64)[:, None] * span
+                  + np.arange(days, dtype=np.int64) * 86400)
+        day_index = (np.searchsorted(merged, starts, side='right') - 1).astype(np.int32)
+        pos = day_index[inverse, (secs - lo) // 86400].astype(np.intp)
+        step = merged[pos + 1] <= query
+        while step.any():
+            pos += step
+            step = merged[pos + 1] <= query
+    else:
+        pos = np.searchsorted(merged, query, side='right') - 1
+    offsets = np.concatenate(zone_offsets)[pos]
+    zone_valid = np.array([tz is not None for tz in resolved_zones], dtype=bool)
+    return {"zones": resolved_zones, "codes": inverse, "local": (secs + offsets).view('datetime64[s]'),
+            "offset": offsets, "dst": np.concatenate(zone_dst)[pos], "valid": zone_valid[inverse]}
+CONVERT_CHUNK_ROWS = 500_000
+def convert_file(file_path: str, out=None) -> None:
+    """Convert "epoch,zone" lines (file or - for stdin) to CSV local times, one vectorized chunk at a time."""
+    import csv
+    out = out or sys.stdout
+    try:
+        np = _require_numpy()
+        source = sys.stdin if file_path == '-' else open(file_path, 'r', newline='')
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return
+    except FileNotFoundError:
+        print(f"❌ File not found: {file_path}", file=sys.stderr)
+        return
+    writer = csv.writer(out)
+    writer.writerow(["epoch", "zone", "timezone", "local_time", "utc_offset", "dst"])
+    offset_labels: Dict[int, str] = {}
+    def flush(epochs: List[str], zones: List[str]) -> None:
+        result = convert_timestamps(np.array(epochs, dtype=np.float64), zones)
+        local = np.datetime_as_string(result["local"], unit='s')
+        for i in range(len(epochs)):
+            if not result["valid"][i]:
+                writer.writerow([epochs[i], zones[i], "", "", "", ""])
+                continue
+            offset = int(result["offset"][i])
+            label = offset_labels.get(offset)
+            if label is None:
+                label = offset_labels[offset] = format_utc_offset(offset)
+            timezone_name = result["zones"][result["codes"][i]]
+            writer.writerow([epochs[i], zones[i], timezone_name, local[i], label, int(result["dst"][i])])
+    epochs: List[str] = []
+    zones: List[str] = []
+    rows = skipped = 0
+    with source:
+        for row in csv.reader(source):
+            if len(row) < 2 or row[0].lstrip().startswith('#'):
+                continue
+            epoch, zone = row[0].strip(), row[1].strip()
+            try:
+                value = float(epoch)
+            except ValueError:
+                value = None
+            if value is None or not CONVERT_EPOCH_MIN <= value <= CONVERT_EPOCH_MAX:
+                skipped += 1
+                continue
+            epochs.append(epoch)
+            zones.append(zone)
+            if len(epochs) >= CONVERT_CHUNK_ROWS:
+                flush(epochs, zones)
+                rows += len(epochs)
+                epochs, zones = [], []
+        if epochs:
+            flush(epochs, zones)
+            rows += len(epochs)
+    print(f"✅ Converted {rows} timestamps" + (f" ({skipped} lines skipped)" if skipped else ""), file=sys.stderr)
 def add_alias(city: str, tz: str, auto_match: bool = False, debug: bool = False) -> bool:
     """Add a new alias with optional auto-matching."""
     city = city.lower()
@@ -500,8 +1949,17 @@ def add_alias(city: str, tz: str, auto_match: bool = False, debug: bool = False)
     save_alias(city, tz)
     print(f"✅ Alias added: {city} → {tz}")
     return True
-def list_aliases() -> None:
-    """List all configured aliases."""
+def list_aliases(prefix: str = "") -> None:
+    """List all configured aliases, or only those starting with prefix."""
+    if prefix:
+        matches = ALIAS_STORE.search(prefix.lower().strip())
+        if not matches:
+            print(f"📜 No aliases starting with '{prefix}'.")
+            return
+        print(f"📜 Aliases starting with '{prefix}':")
+        for city, tz in matches:
+            print(f"  {city} → {tz}")
+        return
     aliases = load_aliases()
     if not aliases:
         print("📜 No aliases configured.")
@@ -509,6 +1967,36 @@ def list_aliases() -> None:
     print("📜 Current aliases:")
     for city in sorted(aliases.keys()):
         print(f"  {city} → {aliases[city]}")
+def import_aliases(file_path: str) -> None:
+    """Import user aliases from a ``key=value`` file (the legacy alias file format) in one batch."""
+    records: Dict[str, str] = {}
+    try:
+        with open(file_path, 'r') as f:
+            for line in f:
+                key, sep, value = line.strip().partition('=')
+                if sep and key:
+                    records[key.lower()] = value
+    except OSError as e:
+        print(f"❌ Cannot read {file_path}: {e}", file=sys.stderr)
+        return
+    # Deliberately laxer than is_valid_timezone: --update-aliases stores every database zone,
+    # slash-less ones (UTC, Japan) included, and an export must re-import without losing them
+    zones = TZ_REGISTRY.zones()
+    invalid = {key for key, tz in records.items() if tz and tz not in zones}
+    puts = {key: tz for key, tz in records.items() if tz and key not in invalid}
+    removed = ALIAS_STORE.update_many(puts, [key for key, tz in records.items() if not tz])
+    print(f"✅ Imported {len(puts)} aliases, removed {len(removed)}")
+    if invalid:
+        print(f"⚠️ Skipped {len(invalid)} with invalid timezones: {', '.join(sorted(invalid)[:10])}", file=sys.stderr)
+def export_aliases(file_path: str) -> None:
+    """Write user aliases as sorted ``key=value`` lines; '-' writes to stdout."""
+    lines = [f"{key}={tz}\n" for key, tz in sorted(ALIAS_STORE.user_aliases().items())]
+    if file_path == '-':
+        sys.stdout.writelines(lines)
+        return
+    with open(file_path, 'w') as f:
+        f.writelines(lines)
+    print(f"✅ Exported {len(lines)} aliases to {file_path}", file=sys.stderr)
 def update_aliases_from_api(debug: bool = False) -> None:
     """Update aliases from API timezone list."""
     print("🔄 Updating aliases from API...")
@@ -533,6 +2021,7 @@ def update_aliases_from_api(debug: bool = False) -> None:
     
     count = 0
     skipped = 0
+    pending = {}
     
     for tz in timezones:
         city = os.path.basename(tz).lower().replace('_', '-')
@@ -543,7 +2032,7 @@ def update_aliases_from_api(debug: bool = False) -> None:
                 print(f"🐛 Skipping existing: {city} → {aliases[city]}", file=sys.stderr)
             continue
         
-        save_alias(city, tz)
+        pending[city] = tz
         count += 1
         
         if debug and count <= 10:
@@ -553,15 +2042,18 @@ def update_aliases_from_api(debug: bool = False) -> None:
             if debug:
                 print(f"🐛 Progress: {count} added, {skipped} skipped", file=sys.stderr)
     
+    # Straight from the zone database, which also lists slash-less zones (UTC, Japan) that save_aliases rejects
+    ALIAS_STORE.put_many(pending)
     print(f"✅ Aliases updated: {count} new entries")
     if debug:
         print(f"🐛 Final stats: {count} added, {skipped} skipped, {count + skipped} total processed", file=sys.stderr)
 def get_time(raw: str, debug: bool = False) -> bool:
     """Get time for a city or timezone."""
-    aliases = load_aliases()
     city = raw.lower()
-    tz = aliases.get(city, city)
-    if not is_valid_timezone(tz):
+    resolved = resolve_city(raw, fuzzy=False)
+    if resolved:
+        tz = resolved.timezone
+    else:
         matched_tz = auto_match_timezone(city, debug=debug)
         if matched_tz and is_valid_timezone(matched_tz):
             tz = matched_tz
@@ -572,7 +2064,7 @@ def get_time(raw: str, debug: bool = False) -> bool:
             print(f"❓ City '{city}' not found.", file=sys.stderr)
             return False
     try:
-        tz_info = ZoneInfo(tz)
+        tz_info = TZ_REGISTRY.zoneinfo(tz)
         now = datetime.now(tz_info)
         time_str = now.isoformat()
         if debug:
@@ -586,9 +2078,9 @@ def get_time(raw: str, debug: bool = False) -> bool:
         return False
 def batch_add(file_path: str) -> None:
     """Batch add aliases from file."""
+    pending = {}
     try:
         with open(file_path, 'r') as f:
-            count = 0
             for line in f:
                 line = line.strip()
                 if not line or line.startswith('#'):
@@ -598,11 +2090,197 @@ def batch_add(file_path: str) -> None:
                     print(f"⚠️ Skipping invalid line: '{line}'", file=sys.stderr)
                     continue
                 city, tz = parts
-                if add_alias(city, tz):
-                    count += 1
-            print(f"✅ Batch add complete: {count} aliases added")
+                if not is_valid_timezone(tz):
+                    print(f"❌ Invalid timezone: {tz}", file=sys.stderr)
+                    continue
+                pending[city.lower()] = tz
+    except FileNotFoundError:
+        print(f"❌ File not found: {file_path}", file=sys.stderr)
+        return
+    count = save_aliases(pending)
+    print(f"✅ Batch add complete: {count} aliases added")
+def time_batch(file_path: str, fmt: str = "csv", out=None) -> None:
+    """Stream current times for names in a file (or - for stdin) as CSV or JSON Lines, never prompting."""
+    import csv, json
+    out = out or sys.stdout
+    try:
+        source = sys.stdin if file_path == '-' else open(file_path, 'r')
     except FileNotFoundError:
         print(f"❌ File not found: {file_path}", file=sys.stderr)
+        return
+    fields = ["city", "timezone", "match", "local_time", "utc_offset", "dst"]
+    writer = csv.writer(out) if fmt == "csv" else None
+    if writer:
+        writer.writerow(fields)
+    rendered: Dict[str, list] = {}
+    second = None
+    rows = unresolved = 0
+    with source:
+        for line in source:
+            city = line.strip()
+            if not city or city.startswith('#'):
+                continue
+            now = int(time.time())
+            if now != second:
+                second, rendered = now, {}
+            resolved = resolve_city(city)
+            if resolved is None:
+                unresolved += 1
+                row = [city, "", "", "", "", ""]
+            else:
+                tz = resolved.timezone
+                values = rendered.get(tz)
+                if values is None:
+                    offset, _, dst = _zone_state(tz, now)
+                    local = datetime.fromtimestamp(now, timezone(timedelta(seconds=offset))).isoformat()
+                    values = rendered[tz] = [local, format_utc_offset(offset), int(dst)]
+                row = [city, tz, resolved.kind] + values
+            rows += 1
+            if writer:
+                writer.writerow(row)
+            else:
+                record = dict(zip(fields, row))
+                if resolved is None:
+                    record = {"city": city, "error": "not found"}
+                else:
+                    record["dst"] = bool(record["dst"])
+                out.write(json.dumps(record) + "\n")
+    out.flush()
+    print(f"✅ Looked up {rows} names" + (f" ({unresolved} not found)" if unresolved else ""), file=sys.stderr)
+RESOLVE_CHUNK_NAMES = 256
+def _resolve_worker_init() -> None:
+    """Build the match indexes once per worker process."""
+    _city_index()
+    _zone_index()
+def _resolve_names(names: List[str]) -> List[Tuple[str, str, float]]:
+    """Resolve a chunk of names to (timezone, kind, score), with empty fields for misses."""
+    results = []
+    for name in names:
+        resolved = resolve_city(name)
+        results.append((resolved.timezone, resolved.kind, round(resolved.score, 4)) if resolved else ("", "", 0.0))
+    return results
+def _completed_rows(out_path: str) -> int:
+    """Count data rows already in a partial output file, dropping any half-written trailing line."""
+    import csv
+    with open(out_path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    with open(out_path, 'r', newline='') as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+def resolve_csv(in_path: str, column: str, out_path: Optional[str] = None, workers: Optional[int] = None,
+                chunk_size: int = RESOLVE_CHUNK_NAMES) -> None:
+    """Add timezone, match and score columns to a CSV, resolving each distinct name once across a process pool.
+
+    Rows keep their input order and are written (and flushed) as soon as every name up to
+    them is resolved, so an interrupted run leaves a usable prefix. With out_path, an
+    existing partial output is resumed after its last complete row; otherwise results go
+    to stdout.
+    """
+    import csv
+    from concurrent.futures import ProcessPoolExecutor
+    try:
+        source = open(in_path, 'r', newline='')
+    except FileNotFoundError:
+        print(f"❌ File not found: {in_path}", file=sys.stderr)
+        return
+    with source:
+        reader = csv.reader(source)
+        header = next(reader, None)
+        if header is None or column not in header:
+            print(f"❌ Column '{column}' not found in {in_path}", file=sys.stderr)
+            return
+        col = header.index(column)
+        done = _completed_rows(out_path) if out_path and os.path.exists(out_path) else 0
+        names: Dict[str, int] = {}
+        for i, row in enumerate(reader):
+            if i >= done and col < len(row):
+                names.setdefault(row[col].strip(), len(names))
+    started = time.monotonic()
+    unique = list(names)
+    chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), max(1, chunk_size))]
+    resolved: List[Tuple[str, str, float]] = []
+    def progress() -> None:
+        rate = len(resolved) / max(time.monotonic() - started, 1e-9)
+        print(f"  ... resolved {len(resolved)}/{len(unique)} unique names ({rate:,.0f}/s)", file=sys.stderr)
+    out = open(out_path, 'a' if done else 'w', newline='') if out_path else sys.stdout
+    rows = 0
+    try:
+        writer = csv.writer(out)
+        if not done:
+            writer.writerow(header + ["timezone", "match", "score"])
+        with open(in_path, 'r', newline='') as source:
+            reader = csv.reader(source)
+            for _ in range(done + 1):
+                next(reader, None)
+            row = next(reader, None)
+            def write_ready() -> None:
+                # Names are numbered by first occurrence and chunks finish in order, so rows become ready as a prefix
+                nonlocal row, rows
+                while row is not None:
+                    if col < len(row):
+                        i = names[row[col].strip()]
+                        if i >= len(resolved):
+                            break
+                        result = resolved[i]
+                    else:
+                        result = ("", "", 0.0)
+                    writer.writerow(row + list(result))
+                    rows += 1
+                    row = next(reader, None)
+                out.flush()
+            write_ready()
+            if workers == 1 or len(chunks) <= 1:
+                for chunk in chunks:
+                    resolved.extend(_resolve_names(chunk))
+                    write_ready()
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_resolve_worker_init) as pool:
+                    for n, results in enumerate(pool.map(_resolve_names, chunks), 1):
+                        resolved.extend(results)
+                        write_ready()
+                        if n % 20 == 0:
+                            progress()
+            progress()
+    finally:
+        if out_path:
+            out.close()
+    elapsed = max(time.monotonic() - started, 1e-9)
+    resumed = f", resumed after {done}" if done else ""
+    print(f"✅ Resolved {rows} rows ({len(unique)} unique names{resumed}) in {elapsed:.1f}s "
+          f"({rows / elapsed:,.0f} rows/s)", file=sys.stderr)
+def show_overlap(cities: List[str], start: Optional[str] = None, end: Optional[str] = None, hours: str = "09:00-17:00",
+                 days: str = "mon-fri", min_minutes: int = 30, min_cities: Optional[int] = None, limit: int = 10,
+                 as_json: bool = False) -> bool:
+    """Print the best shared working-hour slots for cities (default: the next four weeks)."""
+    try:
+        first = date.fromisoformat(start) if start else date.today()
+        last = date.fromisoformat(end) if end else first + timedelta(days=27)
+        plan = plan_overlap(cities, first, last, hours, weekdays=days, min_minutes=min_minutes,
+                            min_cities=min_cities, limit=limit)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return False
+    if as_json:
+        import json
+        print(json.dumps(plan, indent=2))
+        return True
+    who = "all" if plan["min_cities"] == len(cities) else f"at least {plan['min_cities']} of"
+    if not plan["slots"]:
+        print(f"🤷 No {min_minutes}+ minute slot where {who} {len(cities)} cities are working, {first} → {last}")
+        return True
+    print(f"🤝 {plan['total_slots']} slot(s) where {who} {len(cities)} cities are working, {first} → {last}:")
+    for i, slot in enumerate(plan["slots"], 1):
+        start_utc = datetime.fromtimestamp(slot["start_epoch"], timezone.utc)
+        end_utc = datetime.fromtimestamp(slot["end_epoch"], timezone.utc)
+        print(f"  {i}) {start_utc:%a %Y-%m-%d %H:%M} → {end_utc:%H:%M} UTC  "
+              f"({slot['minutes']} min, {slot['attendance']}/{len(cities)} cities)")
+        for entry in slot["local"]:
+            mark = "  " if entry["available"] else "❌"
+            print(f"     {mark} {entry['city']}: {entry['start'].replace('T', ' ')} → {entry['end'][11:]}"
+                  f" {entry['timezone']} ({entry['offset']})")
+    return True
 def edit_aliases() -> None:
     """Interactive alias editor."""
     aliases = load_aliases()
@@ -649,13 +2327,7 @@ def interactive_mode() -> None:
             add_alias(city, tz)
         elif choice == "3":
             city = input("City to remove: ").strip().lower()
-            aliases = load_aliases()
-            if city in aliases:
-                lines = []
-                with open(ALIAS_FILE, 'r') as f:
-                    lines = [line for line in f if not line.startswith(f"{city}=")]
-                with open(ALIAS_FILE, 'w') as f:
-                    f.writelines(lines)
+            if remove_alias(city):
                 print(f"❌ Removed {city}")
             else:
                 print(f"❓ Alias '{city}' not found")
@@ -669,14 +2341,8 @@ def interactive_mode() -> None:
             get_time(city, debug=True)
         elif choice == "7":
             file_path = input("File path: ").strip()
-            try:
-                with open(file_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            get_time(line)
-            except FileNotFoundError:
-                print(f"❌ File not found: {file_path}", file=sys.stderr)
+            if file_path:
+                time_batch(file_path)
         elif choice == "8":
             update_aliases_from_api()
         elif choice == "9":
@@ -685,17 +2351,48 @@ def interactive_mode() -> None:
             break
         else:
             print("❌ Invalid choice")
+PROFILE_TOP = 25
+def profile_call(fn: Callable, path: str, *args):
+    """Run fn under cProfile, dump pstats to path and print the hottest calls and resolution stage times."""
+    import cProfile
+    import pstats
+    stages: Dict[str, List[float]] = {}
+    previous = STAGE_HOOK
+    set_stage_hook(lambda stage, seconds: stages.setdefault(stage, []).append(seconds))
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args)
+    finally:
+        set_stage_hook(previous)
+        profiler.dump_stats(path)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        for stage, times in stages.items():
+            print(f"⏱️ {stage}: {len(times)} run(s), {sum(times) * 1000:.3f} ms total, {max(times) * 1000:.3f} ms max",
+                  file=sys.stderr)
+        print(f"📈 Profile written to {path} (python3 -m pstats {path})", file=sys.stderr)
 def main():
     """Main entry point."""
+    profile = next((arg for arg in sys.argv[2:] if arg == "--profile" or arg.startswith("--profile=")), None)
+    if profile is not None:
+        sys.argv.remove(profile)
+        return profile_call(main, profile.partition("=")[2] or "citytime.prof")
     if len(sys.argv) < 2:
         print("🛠️ Usage:")
-        print(f"  {sys.argv[0]} --list")
+        print(f"  {sys.argv[0]} --list [prefix]")
         print(f"  {sys.argv[0]} --add city [timezone]")
         print(f"  {sys.argv[0]} --time city_or_alias [--debug]")
         print(f"  {sys.argv[0]} --batch-add aliases.txt")
+        print(f"  {sys.argv[0]} --time-batch cities.txt|- [--jsonl]")
+        print(f"  {sys.argv[0]} --resolve-csv input.csv --column city [--output out.csv] [--workers N] [--chunk-size N]")
+        print(f"  {sys.argv[0]} --convert epochs.csv|-")
+        print(f"  {sys.argv[0]} --overlap city1,city2,... [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--hours 09:00-17:00]"
+              f" [--days mon-fri] [--min-minutes 30] [--min-cities N] [--limit 10] [--json]")
+        print(f"  {sys.argv[0]} --import-aliases aliases.txt")
+        print(f"  {sys.argv[0]} --export-aliases out.txt|-")
         print(f"  {sys.argv[0]} --edit-aliases")
         print(f"  {sys.argv[0]} --update-aliases [--debug]")
         print(f"  {sys.argv[0]} --interactive")
+        print("  Append --profile[=out.prof] to any command to write cProfile stats (default citytime.prof)")
         return
     cmd = sys.argv[1]
     if cmd == "--add":
@@ -706,7 +2403,17 @@ def main():
         else:
             print("Usage: --add city [timezone]", file=sys.stderr)
     elif cmd == "--list":
-        list_aliases()
+        list_aliases(sys.argv[2] if len(sys.argv) >= 3 else "")
+    elif cmd == "--import-aliases":
+        if len(sys.argv) >= 3:
+            import_aliases(sys.argv[2])
+        else:
+            print("Usage: --import-aliases file", file=sys.stderr)
+    elif cmd == "--export-aliases":
+        if len(sys.argv) >= 3:
+            export_aliases(sys.argv[2])
+        else:
+            print("Usage: --export-aliases file|-", file=sys.stderr)
     elif cmd == "--time":
         if len(sys.argv) >= 3:
             debug = len(sys.argv) >= 4 and sys.argv[3] == "--debug"
@@ -718,6 +2425,50 @@ def main():
             batch_add(sys.argv[2])
         else:
             print("Usage: --batch-add file", file=sys.stderr)
+    elif cmd == "--time-batch":
+        if len(sys.argv) >= 3:
+            time_batch(sys.argv[2], "jsonl" if "--jsonl" in sys.argv[3:] else "csv")
+        else:
+            print("Usage: --time-batch file|- [--jsonl]", file=sys.stderr)
+    elif cmd == "--resolve-csv":
+        options = dict(zip(sys.argv[3::2], sys.argv[4::2]))
+        if len(sys.argv) >= 3 and "--column" in options:
+            try:
+                workers = int(options["--workers"]) if "--workers" in options else None
+                chunk_size = int(options.get("--chunk-size", RESOLVE_CHUNK_NAMES))
+            except ValueError:
+                workers = chunk_size = 0
+            if (workers is not None and workers < 1) or chunk_size < 1:
+                print("❌ --workers and --chunk-size must be positive integers", file=sys.stderr)
+                sys.exit(1)
+            resolve_csv(sys.argv[2], options["--column"], options.get("--output"), workers, chunk_size)
+        else:
+            print("Usage: --resolve-csv input.csv --column city [--output out.csv] [--workers N] [--chunk-size N]",
+                  file=sys.stderr)
+    elif cmd == "--overlap":
+        args = [arg for arg in sys.argv[3:] if arg != "--json"]
+        options = dict(zip(args[::2], args[1::2]))
+        if len(sys.argv) >= 3:
+            try:
+                min_minutes = int(options.get("--min-minutes", 30))
+                min_cities = int(options["--min-cities"]) if "--min-cities" in options else None
+                limit = int(options.get("--limit", 10))
+            except ValueError:
+                print("❌ --min-minutes, --min-cities and --limit must be integers", file=sys.stderr)
+                sys.exit(1)
+            cities = [city.strip() for city in sys.argv[2].split(',') if city.strip()]
+            if not show_overlap(cities, options.get("--from"), options.get("--to"), options.get("--hours", "09:00-17:00"),
+                                options.get("--days", "mon-fri"), min_minutes, min_cities, limit,
+                                "--json" in sys.argv[3:]):
+                sys.exit(1)
+        else:
+            print("Usage: --overlap city1,city2,... [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--hours 09:00-17:00]"
+                  " [--days mon-fri] [--min-minutes 30] [--min-cities N] [--limit 10] [--json]", file=sys.stderr)
+    elif cmd == "--convert":
+        if len(sys.argv) >= 3:
+            convert_file(sys.argv[2])
+        else:
+            print("Usage: --convert file|-", file=sys.stderr)
     elif cmd == "--edit-aliases":
         edit_aliases()
     elif cmd == "--update-aliases":
@@ -1,52 +1,393 @@
 #!/usr/bin/env python3
 """Web UI server for citytime.py"""
+import gc
+import gzip
+import hashlib
+import heapq
+import hmac
+import io
+import itertools
+import marshal
 import os
+import random
+import signal
+import socket
 import sys
+import threading
+import time
 import urllib.request
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo, available_timezones
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 
-from flask import Flask, jsonify, request, render_template, abort
+from flask import Flask, Response, g, jsonify, request, render_template, abort
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
 
 # Add the directory containing citytime.py to the path
 sys.path.insert(0, str(Path(__file__).parent))
 from citytime import (
-    load_aliases, save_alias, is_valid_timezone,
-    find_timezone_matches, ALIAS_FILE
+    load_aliases, save_alias, remove_alias, update_aliases,
+    is_valid_timezone, find_timezone_matches, search_aliases, resolve_city,
+    zone_schedule, convert_timestamps, format_utc_offset, warm_caches, set_stage_hook, plan_overlap, ALIAS_STORE,
+    RESOLUTION_CACHE, TZ_REGISTRY
 )
 
 app = Flask(__name__)
 
-# Cache the sorted timezone list at startup
-_ALL_TIMEZONES = sorted(available_timezones())
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 
-def _resolve_city(city: str):
-    """Resolve a city name to (timezone_str, display_name) or None."""
-    city_norm = city.lower().strip()
-    aliases = load_aliases()
+class Metrics:
+    """Counters and histograms aggregated per thread, rendered in Prometheus text format.
+
+    Each thread writes only to its own shard, so recording takes no lock; a scrape
+    sums the shards and folds those of finished threads into a retired total.
+    """
+
+    LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+    MAX_SHARDS = 256
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = self._new_shard()
+        self._help = {}
+
+    @staticmethod
+    def _new_shard() -> dict:
+        return {"counters": {}, "histograms": {}}
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = self._new_shard()
+            with self._lock:
+                if len(self._shards) >= self.MAX_SHARDS:
+                    self._retire_dead()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def describe(self, name: str, kind: str, text: str) -> None:
+        self._help[name] = (kind, text)
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1) -> None:
+        """Add to a counter; labels is a tuple of (label, value) pairs."""
+        counters = self._shard()["counters"]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: tuple = ()) -> None:
+        """Record a histogram sample (seconds)."""
+        histograms = self._shard()["histograms"]
+        key = (name, labels)
+        hist = histograms.get(key)
+        if hist is None:
+            hist = histograms[key] = [0] * (len(self.LATENCY_BUCKETS) + 1) + [0.0]
+        hist[bisect_left(self.LATENCY_BUCKETS, value)] += 1
+        hist[-1] += value
+
+    @staticmethod
+    def _merge(into: dict, shard: dict) -> None:
+        for key, value in list(shard["counters"].items()):
+            into["counters"][key] = into["counters"].get(key, 0) + value
+        for key, hist in list(shard["histograms"].items()):
+            total = into["histograms"].setdefault(key, [0] * len(hist[:-1]) + [0.0])
+            for i, value in enumerate(hist):
+                total[i] += value
+
+    def _retire_dead(self) -> None:
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge(self._retired, shard)
+        self._shards = alive
+
+    def snapshot(self) -> dict:
+        """Sum of all shards: {"counters": {(name, labels): n}, "histograms": {(name, labels): buckets}}."""
+        total = self._new_shard()
+        with self._lock:
+            self._retire_dead()
+            self._merge(total, self._retired)
+            for _, shard in self._shards:
+                self._merge(total, shard)
+        return total
+
+    @staticmethod
+    def _labels(labels: tuple, extra: tuple = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self, gauges: dict = None) -> str:
+        """Prometheus text exposition of every counter, histogram and the given gauges."""
+        snap = self.snapshot()
+        series = {}
+        for (name, labels), value in list(snap["counters"].items()) + list((gauges or {}).items()):
+            series.setdefault(name, []).append((labels, [f"{name}{self._labels(labels)} {value:g}"]))
+        for (name, labels), hist in snap["histograms"].items():
+            lines = []
+            cumulative = 0
+            for bound, count in zip(self.LATENCY_BUCKETS + (float("inf"),), hist[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{name}_bucket{self._labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{self._labels(labels)} {hist[-1]:.6f}")
+            lines.append(f"{name}_count{self._labels(labels)} {cumulative}")
+            series.setdefault(name, []).append((labels, lines))
+        out = []
+        for name in sorted(series):
+            kind, text = self._help.get(name, ("untyped", ""))
+            out.append(f"# HELP {name} {text}")
+            out.append(f"# TYPE {name} {kind}")
+            for _, lines in sorted(series[name], key=lambda item: item[0]):
+                out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+METRICS = Metrics()
+METRICS.describe("citytime_http_requests_total", "counter", "HTTP requests by route, method and status")
+METRICS.describe("citytime_http_request_duration_seconds", "histogram", "HTTP request latency by route")
+METRICS.describe("citytime_resolutions_total", "counter",
+                 "City resolutions by answering stage (alias, iana, database, fuzzy, miss)")
+METRICS.describe("citytime_payload_cache_total", "counter", "Pre-serialized JSON payload lookups by result")
+METRICS.describe("citytime_http_not_modified_total", "counter", "Conditional requests answered with 304")
+METRICS.describe("citytime_headline_fetches_total", "counter", "Headline feed fetches by result")
+METRICS.describe("citytime_headline_fetch_duration_seconds", "histogram", "Headline feed fetch latency")
+METRICS.describe("citytime_resolution_cache_hits_total", "counter", "Resolution cache hits")
+METRICS.describe("citytime_resolution_cache_misses_total", "counter", "Resolution cache misses")
+METRICS.describe("citytime_resolution_cache_hit_ratio", "gauge", "Resolution cache hit ratio since start")
+METRICS.describe("citytime_resolution_cache_entries", "gauge", "Entries in the resolution cache")
+METRICS.describe("citytime_alias_reloads_total", "counter", "Alias file (re)loads from disk")
+METRICS.describe("citytime_aliases", "gauge", "Merged aliases currently loaded")
+METRICS.describe("citytime_headlines_stale", "gauge", "1 if the served headlines are past their TTL")
+METRICS.describe("citytime_time_memo_total", "counter", "/api/time per-second response memo lookups by result")
+METRICS.describe("citytime_resolution_stage_seconds", "histogram",
+                 "Time spent in each resolution stage (alias, iana, database, fuzzy) on cache misses")
+
+
+class RequestProfiler:
+    """cProfile a sampled fraction of requests, keeping the slowest few per route for download.
+
+    Disabled unless a shared secret is configured. Requests presenting the secret in the
+    X-Citytime-Profile header are always profiled; the rest are sampled at `rate`. Only one
+    request per process is profiled at a time, so concurrent ones run unprofiled.
+    """
+
+    HEADER = "X-Citytime-Profile"
+
+    def __init__(self, secret: str = "", rate: float = 0.01, keep: int = 5):
+        self.secret = secret
+        self.rate = rate
+        self.keep = keep
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._slowest = {}
+        self._ids = itertools.count(1)
+
+    def authorized(self, headers) -> bool:
+        """True if profiling is enabled and the request carries the shared secret."""
+        return bool(self.secret) and hmac.compare_digest(headers.get(self.HEADER, "").encode(), self.secret.encode())
+
+    def start(self, forced: bool = False):
+        """Begin profiling the current request if it is sampled; returns the running profiler or None."""
+        if not self.secret or not (forced or random.random() < self.rate):
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (a debugger, or --profile) already owns the hook
+            self._busy.release()
+            return None
+        self._local.stages = []
+        return profiler
+
+    def stage(self, stage: str, seconds: float) -> None:
+        """Note a resolution stage timing against the request being profiled on this thread, if any."""
+        stages = getattr(self._local, "stages", None)
+        if stages is not None:
+            stages.append({"stage": stage, "ms": round(seconds * 1000, 3)})
+
+    def abandon(self, profiler) -> None:
+        profiler.disable()
+        self._local.stages = None
+        self._busy.release()
+
+    def finish(self, profiler, route: str, method: str, path: str, status: int, seconds: float) -> None:
+        """Stop profiling and keep the result if it is among the `keep` slowest seen for its route."""
+        stages = self._local.stages
+        self.abandon(profiler)
+        with self._lock:
+            heap = self._slowest.get(route, [])
+            if len(heap) >= self.keep and seconds <= heap[0][0]:
+                return
+        profiler.create_stats()
+        # Stored marshalled: pstats.Stats(profiler) would move the stats out of the profiler
+        data = marshal.dumps(profiler.stats)
+        record = {"id": next(self._ids), "route": route, "method": method, "path": path, "status": status,
+                  "duration_ms": round(seconds * 1000, 3), "at": time.time(), "stages": stages}
+        with self._lock:
+            heap = self._slowest.setdefault(route, [])
+            entry = (seconds, record["id"], record, data)
+            if len(heap) < self.keep:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+
+    def profiles(self) -> list:
+        """Metadata of every kept profile, slowest first within each route."""
+        with self._lock:
+            entries = [entry for heap in self._slowest.values() for entry in heap]
+        entries.sort(key=lambda entry: (entry[2]["route"], -entry[0]))
+        return [entry[2] for entry in entries]
+
+    def _find(self, profile_id: int):
+        with self._lock:
+            return next((entry[3] for heap in self._slowest.values() for entry in heap
+                         if entry[1] == profile_id), None)
+
+    def dump(self, profile_id: int):
+        """The profile in pstats' binary format (loadable with pstats/snakeviz), or None if not kept."""
+        return self._find(profile_id)
+
+    def report(self, profile_id: int, sort: str = "cumulative", limit: int = 40):
+        """The profile as a pstats text report, or None if not kept."""
+        import pstats
+        data = self._find(profile_id)
+        if data is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(_StoredProfile(data), stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+class _StoredProfile:
+    """A kept profile in the shape pstats.Stats loads from (it takes, and empties, .stats)."""
+
+    def __init__(self, data: bytes):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self) -> None:
+        pass
+
+
+PROFILER = RequestProfiler(os.environ.get("CITYTIME_PROFILE_SECRET", ""),
+                           float(os.environ.get("CITYTIME_PROFILE_RATE", 0.01)),
+                           int(os.environ.get("CITYTIME_PROFILE_KEEP", 5)))
+
+
+def _record_stage(stage: str, seconds: float) -> None:
+    METRICS.observe("citytime_resolution_stage_seconds", seconds, (("stage", stage),))
+    PROFILER.stage(stage, seconds)
+
+
+set_stage_hook(_record_stage)
+
+
+@app.before_request
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+    if PROFILER.secret and not request.path.startswith("/admin/"):
+        g.profiler = PROFILER.start(PROFILER.authorized(request.headers))
+
 
-    # Direct alias/city lookup
-    tz = aliases.get(city_norm)
-    if tz and is_valid_timezone(tz):
-        return tz, city
+@app.after_request
+def _record_request(response):
+    start = g.pop("metrics_start", None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        METRICS.observe("citytime_http_request_duration_seconds", elapsed, (("route", route),))
+        METRICS.inc("citytime_http_requests_total",
+                    (("route", route), ("method", request.method), ("status", str(response.status_code))))
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            PROFILER.finish(profiler, route, request.method, request.full_path.rstrip("?"), response.status_code,
+                            elapsed)
+    return response
 
-    # Maybe the input is already a valid IANA timezone
-    if is_valid_timezone(city_norm) or is_valid_timezone(city):
-        return city if is_valid_timezone(city) else city_norm, city
 
-    # Fuzzy match (top result only, no interactive prompts)
-    matches = find_timezone_matches(city_norm)
-    if matches and matches[0][1] >= 0.8:
-        return matches[0][0], city
+@app.teardown_request
+def _drop_profile(exc):
+    # after_request is skipped when a view raises; never leave the profiler running
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        PROFILER.abandon(profiler)
 
-    return None, city
+
+class CachedPayload:
+    """A JSON response body serialized once, with a content-hash ETag and pre-compressed variants."""
+
+    MIN_COMPRESS = 1024
+
+    def __init__(self, data):
+        self.body = app.json.dumps(data).encode()
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.variants = {}
+        if len(self.body) >= self.MIN_COMPRESS:
+            self.variants["gzip"] = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(self.body)
+
+    def response(self, cache_control: str) -> Response:
+        """Serve the best variant for Accept-Encoding, or a 304 if If-None-Match already has it."""
+        accepted = {part.split(";")[0].strip() for part in request.headers.get("Accept-Encoding", "").split(",")}
+        encoding = next((enc for enc in ("br", "gzip") if enc in accepted and enc in self.variants), None)
+        # Strong ETags must differ per content-coding; any variant of this body revalidates
+        etag = f"{self.etag}-{encoding}" if encoding else self.etag
+        if any(tag.strip().removeprefix("W/").strip('"').split("-")[0] == self.etag or tag.strip() == "*"
+               for tag in request.headers.get("If-None-Match", "").split(",")):
+            resp = Response(status=304)
+            METRICS.inc("citytime_http_not_modified_total")
+        else:
+            resp = Response(self.variants[encoding] if encoding else self.body, mimetype="application/json")
+            if encoding:
+                resp.headers["Content-Encoding"] = encoding
+        resp.headers["ETag"] = f'"{etag}"'
+        resp.headers["Cache-Control"] = cache_control
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+
+_PAYLOADS: dict = {}
+
+
+def _cached_payload(name: str, version, build) -> CachedPayload:
+    """Return the payload for name at this data version, building it only when the version changes."""
+    cached = _PAYLOADS.get(name)
+    if cached is None or cached[0] != version:
+        METRICS.inc("citytime_payload_cache_total", (("payload", name), ("result", "build")))
+        cached = _PAYLOADS[name] = (version, CachedPayload(build()))
+    else:
+        METRICS.inc("citytime_payload_cache_total", (("payload", name), ("result", "hit")))
+    return cached[1]
+
+
+def _resolve_city(city: str):
+    """Resolve a city name to (timezone_str, display_name); timezone_str is None if not found."""
+    resolved = resolve_city(city)
+    METRICS.inc("citytime_resolutions_total", (("stage", resolved.kind if resolved else "miss"),))
+    return (resolved.timezone if resolved else None), city
 
 
 @app.route("/debug-test")
 def debug_test():
+    if not app.debug:
+        abort(404)
     raise Exception("test error")
 
 
@@ -55,34 +396,261 @@ def index():
     return render_template("index.html")
 
 
+_TIME_FIELDS = ("city", "timezone", "iso", "time", "date", "offset", "abbr")
+MAX_BATCH_CITIES = 500
+
+
+def _time_fields(tz_str: str, now_utc: datetime):
+    """Format now_utc in tz_str as (iso, time, date, offset, abbr)."""
+    now = now_utc.astimezone(TZ_REGISTRY.zoneinfo(tz_str))
+    offset = now.strftime("%z")
+    offset_fmt = f"UTC{offset[:3]}:{offset[3:]}" if offset else "UTC"
+    return (
+        now.isoformat(),
+        now.strftime("%H:%M:%S"),
+        now.strftime("%Y-%m-%d"),
+        offset_fmt,
+        now.strftime("%Z"),
+    )
+
+
+class SecondMemo:
+    """/api/time bodies pre-serialized once per (zone, UTC second) and shared by every client.
+
+    A body is stored as the JSON before and after the "city" value, so each request only
+    splices in its own query string. Each entry carries its second and get() checks it, so
+    a body built late for an earlier second is never served for a later one. The map is
+    replaced wholesale when a newer second is first built (never by an older one), so it
+    holds at most one second's worth of zones plus stragglers that are never read.
+    """
+
+    _CITY = "\x00"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._second = None
+        self._entries = {}
+
+    def get(self, tz_str: str, second: int):
+        """(head, tail) bytes for tz_str at this second, or None."""
+        entry = self._entries.get(tz_str)
+        if entry is None or entry[0] != second:
+            return None
+        return entry[1], entry[2]
+
+    def build(self, tz_str: str, second: int):
+        """Format and serialize tz_str at this second, remember it and return (head, tail)."""
+        fields = _time_fields(tz_str, datetime.fromtimestamp(second, timezone.utc))
+        body = jsonify(dict(zip(_TIME_FIELDS, (self._CITY, tz_str) + fields))).get_data()
+        head, tail = body.split(app.json.dumps(self._CITY).encode(), 1)
+        with self._lock:
+            if self._second is None or second > self._second:
+                self._entries, self._second = {}, second
+            if second == self._second:
+                self._entries[tz_str] = (second, head, tail)
+        return head, tail
+
+
+TIME_MEMO = SecondMemo()
+
+
 @app.route("/api/time/<path:city>")
 def api_get_time(city: str):
     tz_str, display = _resolve_city(city)
     if not tz_str:
         return jsonify({"error": f"City '{city}' not found"}), 404
 
-    try:
-        tz_info = ZoneInfo(tz_str)
-        now = datetime.now(tz_info)
-        offset = now.strftime("%z")
-        offset_fmt = f"UTC{offset[:3]}:{offset[3:]}" if offset else "UTC"
+    second = int(time.time())
+    parts = TIME_MEMO.get(tz_str, second)
+    if parts is None:
+        METRICS.inc("citytime_time_memo_total", (("result", "build"),))
+        try:
+            parts = TIME_MEMO.build(tz_str, second)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+    else:
+        METRICS.inc("citytime_time_memo_total", (("result", "hit"),))
+    return Response(parts[0] + app.json.dumps(city).encode() + parts[1], mimetype="application/json")
+
+
+@app.route("/api/times", methods=["POST"])
+def api_get_times():
+    data = request.get_json(force=True, silent=True) or {}
+    cities = data.get("cities")
+    if not isinstance(cities, list) or not cities:
+        return jsonify({"error": "cities must be a non-empty list"}), 400
+    if len(cities) > MAX_BATCH_CITIES:
+        return jsonify({"error": f"at most {MAX_BATCH_CITIES} cities per request"}), 400
+    compact = bool(data.get("compact")) or request.args.get("compact") in ("1", "true")
+
+    # One clock reading and one formatting pass per distinct zone for the whole batch
+    now_utc = datetime.now(timezone.utc)
+    formatted = {}
+    rows = []
+    for city in cities:
+        if not isinstance(city, str) or not city.strip():
+            rows.append((city, None, "city must be a non-empty string"))
+            continue
+        tz_str, _ = _resolve_city(city)
+        if not tz_str:
+            rows.append((city, None, f"City '{city}' not found"))
+            continue
+        if tz_str not in formatted:
+            try:
+                formatted[tz_str] = _time_fields(tz_str, now_utc)
+            except Exception as e:
+                formatted[tz_str] = str(e)
+        rows.append((city, tz_str, formatted[tz_str]))
+
+    if compact:
         return jsonify({
-            "city": city,
-            "timezone": tz_str,
-            "iso": now.isoformat(),
-            "time": now.strftime("%H:%M:%S"),
-            "date": now.strftime("%Y-%m-%d"),
-            "offset": offset_fmt,
-            "abbr": now.strftime("%Z"),
+            "now": now_utc.isoformat(),
+            "fields": list(_TIME_FIELDS) + ["error"],
+            "rows": [
+                [city, tz_str, *result, None] if isinstance(result, tuple)
+                else [city, tz_str] + [None] * (len(_TIME_FIELDS) - 2) + [result]
+                for city, tz_str, result in rows
+            ],
         })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+
+    results = []
+    for city, tz_str, result in rows:
+        if isinstance(result, tuple):
+            results.append(dict(zip(_TIME_FIELDS, (city, tz_str) + result)))
+        else:
+            item = {"city": city, "error": result}
+            if tz_str:
+                item["timezone"] = tz_str
+            results.append(item)
+    return jsonify({"now": now_utc.isoformat(), "results": results})
+
+
+MAX_SCHEDULE_AGE = 7 * 86400
+
+
+def _schedule_response(payload, valid_until: int):
+    """JSON response cacheable until valid_until (the next offset transition), capped at a week."""
+    now = int(datetime.now(timezone.utc).timestamp())
+    max_age = max(0, min(valid_until - now, MAX_SCHEDULE_AGE))
+    resp = jsonify(payload)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = max_age
+    resp.expires = datetime.fromtimestamp(now + max_age, timezone.utc)
+    return resp
+
+
+@app.route("/api/schedule/<path:zone>")
+def api_schedule(zone: str):
+    count = request.args.get("count", 4, type=int)
+    tz_str, _ = _resolve_city(zone)
+    if not tz_str:
+        return jsonify({"error": f"City '{zone}' not found"}), 404
+    schedule = zone_schedule(tz_str, count)
+    return _schedule_response(dict(schedule, query=zone), schedule["valid_until"])
+
+
+@app.route("/api/schedules", methods=["POST"])
+def api_schedules():
+    data = request.get_json(force=True, silent=True) or {}
+    zones = data.get("zones")
+    if not isinstance(zones, list) or not zones:
+        return jsonify({"error": "zones must be a non-empty list"}), 400
+    if len(zones) > MAX_BATCH_CITIES:
+        return jsonify({"error": f"at most {MAX_BATCH_CITIES} zones per request"}), 400
+    try:
+        count = int(data.get("count", 4))
+    except (TypeError, ValueError):
+        return jsonify({"error": "count must be an integer"}), 400
+
+    results = []
+    valid_until = None
+    for zone in zones:
+        tz_str, _ = _resolve_city(zone) if isinstance(zone, str) and zone.strip() else (None, zone)
+        if not tz_str:
+            results.append({"query": zone, "error": f"City '{zone}' not found"})
+            continue
+        schedule = zone_schedule(tz_str, count)
+        results.append(dict(schedule, query=zone))
+        if valid_until is None or schedule["valid_until"] < valid_until:
+            valid_until = schedule["valid_until"]
+
+    if valid_until is None:
+        return jsonify({"results": results})
+    return _schedule_response({"results": results, "valid_until": valid_until}, valid_until)
+
+
+@app.route("/api/overlap", methods=["POST"])
+def api_overlap():
+    data = request.get_json(force=True, silent=True) or {}
+    cities = data.get("cities")
+    if not isinstance(cities, list) or not cities or not all(isinstance(c, str) and c.strip() for c in cities):
+        return jsonify({"error": "cities must be a non-empty list of names"}), 400
+    hours_by_city = data.get("hours_by_city") or {}
+    if not isinstance(hours_by_city, dict) or not all(isinstance(text, str) for text in hours_by_city.values()):
+        return jsonify({"error": "hours_by_city must map city names to HH:MM-HH:MM"}), 400
+    try:
+        min_minutes = int(data.get("min_minutes", 30))
+        min_cities = int(data["min_cities"]) if data.get("min_cities") is not None else None
+        limit = int(data.get("limit", 20))
+    except (TypeError, ValueError):
+        return jsonify({"error": "min_minutes, min_cities and limit must be integers"}), 400
+    try:
+        start = date.fromisoformat(data["start"]) if data.get("start") else date.today()
+        end = date.fromisoformat(data["end"]) if data.get("end") else start + timedelta(days=27)
+        plan = plan_overlap(cities, start, end, str(data.get("hours", "09:00-17:00")), hours_by_city,
+                            data.get("weekdays", "mon-fri"), min_minutes, min_cities, limit)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(plan)
+
+
+MAX_CONVERT_ROWS = 100_000
+
+
+@app.route("/api/convert", methods=["POST"])
+def api_convert():
+    data = request.get_json(force=True, silent=True) or {}
+    timestamps = data.get("timestamps")
+    zones = data.get("zones", data.get("zone"))
+    if not isinstance(timestamps, list) or not timestamps:
+        return jsonify({"error": "timestamps must be a non-empty list of epoch seconds"}), 400
+    if len(timestamps) > MAX_CONVERT_ROWS:
+        return jsonify({"error": f"at most {MAX_CONVERT_ROWS} timestamps per request"}), 400
+    if isinstance(zones, list):
+        if len(zones) != len(timestamps) or not all(isinstance(z, str) for z in zones):
+            return jsonify({"error": "zones must be a list of names aligned with timestamps"}), 400
+    elif not isinstance(zones, str) or not zones.strip():
+        return jsonify({"error": "zone (a name) or zones (a list of names) is required"}), 400
+    if not all(isinstance(t, (int, float)) and not isinstance(t, bool) for t in timestamps):
+        return jsonify({"error": "timestamps must be numbers"}), 400
+
+    try:
+        result = convert_timestamps(timestamps, zones)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 501
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    import numpy as np
+    valid = result["valid"].tolist()
+    local = np.datetime_as_string(result["local"], unit="s").tolist()
+    offsets = result["offset"].tolist()
+    labels = {offset: format_utc_offset(offset) for offset in set(offsets)}
+    codes = result["codes"].tolist()
+    return jsonify({
+        "zones": result["zones"],
+        "timezone": [result["zones"][c] for c in codes],
+        "local": [t if ok else None for t, ok in zip(local, valid)],
+        "offset_seconds": [o if ok else None for o, ok in zip(offsets, valid)],
+        "offset": [labels[o] if ok else None for o, ok in zip(offsets, valid)],
+        "dst": [d if ok else None for d, ok in zip(result["dst"].tolist(), valid)],
+    })
 
 
 @app.route("/api/aliases", methods=["GET"])
 def api_list_aliases():
-    aliases = load_aliases()
-    return jsonify(aliases)
+    payload = _cached_payload("aliases", ALIAS_STORE.current_version(), load_aliases)
+    return payload.response("no-cache")
 
 
 @app.route("/api/aliases", methods=["POST"])
@@ -102,47 +670,124 @@ def api_add_alias():
     return jsonify({"ok": True, "city": city, "timezone": timezone})
 
 
+@app.route("/api/aliases/bulk", methods=["POST"])
+def api_bulk_aliases():
+    data = request.get_json(force=True, silent=True) or {}
+    aliases = data.get("aliases") or {}
+    remove = data.get("remove") or []
+    if not isinstance(aliases, dict) or not isinstance(remove, list):
+        return jsonify({"error": "expected {\"aliases\": {city: timezone}, \"remove\": [city, ...]}"}), 400
+
+    records = {str(city).strip().lower(): str(tz).strip() for city, tz in aliases.items()}
+    try:
+        saved, removed = update_aliases(records, [str(city).strip() for city in remove])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"ok": True, "saved": saved, "removed": removed})
+
+
 @app.route("/api/aliases/<path:city>", methods=["DELETE"])
 def api_delete_alias(city: str):
     city = city.strip().lower()
-    if not ALIAS_FILE.exists():
-        return jsonify({"error": "Alias not found"}), 404
+    if not remove_alias(city):
+        return jsonify({"error": f"'{city}' not found in user aliases"}), 404
 
-    with open(ALIAS_FILE, "r") as f:
-        lines = f.readlines()
+    return jsonify({"ok": True, "removed": city})
 
-    new_lines = [l for l in lines if not l.startswith(f"{city}=")]
-    if len(new_lines) == len(lines):
-        return jsonify({"error": f"'{city}' not found in user aliases"}), 404
 
-    temp = ALIAS_FILE.with_suffix(".tmp")
-    with open(temp, "w") as f:
-        f.writelines(new_lines)
-    temp.replace(ALIAS_FILE)
+@app.route("/api/stats")
+def api_stats():
+    return jsonify({"resolution_cache": RESOLUTION_CACHE.stats(), "headlines": HEADLINES.stats()})
+
+
+@app.route("/metrics")
+def metrics():
+    cache = RESOLUTION_CACHE.stats()
+    headlines = HEADLINES.stats()
+    gauges = {
+        ("citytime_resolution_cache_hits_total", ()): cache["hits"],
+        ("citytime_resolution_cache_misses_total", ()): cache["misses"],
+        ("citytime_resolution_cache_hit_ratio", ()): cache["hit_ratio"],
+        ("citytime_resolution_cache_entries", ()): cache["size"],
+        ("citytime_alias_reloads_total", ()): ALIAS_STORE.reloads,
+        ("citytime_aliases", ()): len(load_aliases()),
+        ("citytime_headlines_stale", ()): int(headlines["stale"]),
+    }
+    return Response(METRICS.render(gauges), mimetype="text/plain; version=0.0.4")
 
-    return jsonify({"ok": True, "removed": city})
+
+@app.route("/admin/profiles")
+def admin_profiles():
+    if not PROFILER.authorized(request.headers):
+        abort(404)
+    return jsonify({"rate": PROFILER.rate, "keep": PROFILER.keep, "profiles": PROFILER.profiles()})
+
+
+@app.route("/admin/profiles/<int:profile_id>")
+def admin_profile(profile_id: int):
+    if not PROFILER.authorized(request.headers):
+        abort(404)
+    if request.args.get("format") == "text":
+        sort = request.args.get("sort", "cumulative")
+        try:
+            report = PROFILER.report(profile_id, sort)
+        except KeyError:
+            return jsonify({"error": f"Unknown sort key: {sort}"}), 400
+        if report is None:
+            return jsonify({"error": "Profile not found"}), 404
+        return Response(report, mimetype="text/plain")
+    data = PROFILER.dump(profile_id)
+    if data is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return Response(data, mimetype="application/octet-stream",
+                    headers={"Content-Disposition": f'attachment; filename="citytime-{profile_id}.prof"'})
 
 
 @app.route("/api/timezones")
 def api_timezones():
-    return jsonify(_ALL_TIMEZONES)
+    payload = _cached_payload("timezones", TZ_REGISTRY.current_version(), TZ_REGISTRY.sorted)
+    return payload.response("public, max-age=3600")
 
 
-_headlines_cache: dict = {"data": None, "expires": None}
+class HeadlineFeed:
+    """RSS headlines kept fresh by a background thread and served stale-while-revalidate.
 
-@app.route("/api/headlines")
-def api_headlines():
-    now = datetime.now(timezone.utc)
-    if _headlines_cache["data"] and _headlines_cache["expires"] and now < _headlines_cache["expires"]:
-        return jsonify(_headlines_cache["data"])
-    try:
-        url = "https://news.google.com/rss?hl=en-US&gl=US&ceid=US:en"
-        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urllib.request.urlopen(req, timeout=5) as resp:
+    Requests only ever read the cached list. A daemon thread re-fetches the feed
+    refresh_ahead seconds before it expires, at most one fetch runs at a time, and
+    failures back off exponentially (capped at max_backoff) while the last good
+    list keeps being served.
+    """
+
+    def __init__(self, url: str, ttl: float = 600, refresh_ahead: float = 60, timeout: float = 5,
+                 max_items: int = 6, min_backoff: float = 5, max_backoff: float = 600):
+        self.url = url
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.timeout = timeout
+        self.max_items = max_items
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._fetching = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._data = None
+        self._expires = 0.0
+        self._failures = 0
+        self._next_attempt = 0.0
+        self.fetch_count = 0
+        self.error_count = 0
+
+    def fetch(self) -> list:
+        """Download and parse the feed (blocking; called from the refresher)."""
+        req = urllib.request.Request(self.url, headers={"User-Agent": "Mozilla/5.0"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
             xml_data = resp.read()
         root = ET.fromstring(xml_data)
         channel = root.find("channel")
-        items = channel.findall("item")[:6]
+        items = channel.findall("item")[:self.max_items]
         headlines = []
         for item in items:
             title_el = item.find("title")
@@ -153,34 +798,97 @@ def api_headlines():
                 if " - " in title:
                     title = title.rsplit(" - ", 1)[0]
                 headlines.append({"title": title, "url": link})
-        _headlines_cache["data"] = headlines
-        _headlines_cache["expires"] = now + timedelta(minutes=10)
-        return jsonify(headlines)
-    except Exception:
-        if _headlines_cache["data"]:
-            return jsonify(_headlines_cache["data"])
-        return jsonify([])
+        return headlines
+
+    def refresh(self) -> bool:
+        """Fetch once unless a fetch is already running; returns True if new data was stored."""
+        if not self._fetching.acquire(blocking=False):
+            return False
+        started = time.perf_counter()
+        try:
+            self.fetch_count += 1
+            headlines = self.fetch()
+        except Exception:
+            METRICS.observe("citytime_headline_fetch_duration_seconds", time.perf_counter() - started)
+            METRICS.inc("citytime_headline_fetches_total", (("result", "error"),))
+            with self._lock:
+                self.error_count += 1
+                self._failures += 1
+                delay = min(self.max_backoff, self.min_backoff * 2 ** (self._failures - 1))
+                self._next_attempt = time.monotonic() + delay
+            return False
+        finally:
+            self._fetching.release()
+        METRICS.observe("citytime_headline_fetch_duration_seconds", time.perf_counter() - started)
+        METRICS.inc("citytime_headline_fetches_total", (("result", "success"),))
+        with self._lock:
+            self._data = headlines
+            self._expires = time.monotonic() + self.ttl
+            self._failures = 0
+            self._next_attempt = self._expires - self.refresh_ahead
+        return True
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            with self._lock:
+                delay = self._next_attempt - time.monotonic()
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+                continue
+            self.refresh()
+
+    def start(self) -> None:
+        """Start the background refresher (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="headline-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def get(self) -> list:
+        """Return the cached headlines without blocking ([] until the first fetch lands)."""
+        self.start()
+        with self._lock:
+            return list(self._data or [])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"fetches": self.fetch_count, "errors": self.error_count, "failures": self._failures,
+                    "stale": self._data is not None and time.monotonic() >= self._expires,
+                    "ttl_remaining": max(0.0, self._expires - time.monotonic()) if self._data else None}
+
+
+HEADLINES = HeadlineFeed(os.environ.get("CITYTIME_HEADLINES_URL",
+                                        "https://news.google.com/rss?hl=en-US&gl=US&ceid=US:en"))
+
+
+@app.route("/api/headlines")
+def api_headlines():
+    return jsonify(HEADLINES.get())
 
 
 @app.route("/api/search/<path:query>")
 def api_search(query: str):
     query_norm = query.lower().strip()
-    aliases = load_aliases()
+    limit = max(1, min(request.args.get("limit", 15, type=int), 100))
+    offset = max(0, request.args.get("offset", 0, type=int))
 
-    results = []
-    seen_tz = set()
-
-    # Exact + partial alias matches first
-    for city, tz in sorted(aliases.items()):
-        if query_norm in city:
-            if tz not in seen_tz:
-                seen_tz.add(tz)
-            results.append({"city": city, "timezone": tz, "score": 1.0 if city == query_norm else 0.9})
-        if len(results) >= 20:
-            break
+    # Exact, prefix, then substring alias matches from the typeahead index
+    results = [
+        {"city": city, "timezone": tz, "score": score}
+        for city, tz, score in search_aliases(query_norm, limit, offset)
+    ]
 
     # Fuzzy timezone matches if we need more
-    if len(results) < 10:
+    if offset == 0 and len(results) < min(limit, 10):
         matches = find_timezone_matches(query_norm)
         for tz, score in matches[:10]:
             city_label = os.path.basename(tz).replace("_", " ")
@@ -196,10 +904,269 @@ def api_search(query: str):
             deduped.append(r)
 
     deduped.sort(key=lambda x: x["score"], reverse=True)
-    return jsonify(deduped[:15])
+    return jsonify(deduped[:limit])
+
+
+def prewarm() -> None:
+    """Build indexes, zone tables and the cached JSON payloads before serving."""
+    warm_caches()
+    _cached_payload("timezones", TZ_REGISTRY.current_version(), TZ_REGISTRY.sorted)
+    _cached_payload("aliases", ALIAS_STORE.current_version(), load_aliases)
+
+
+class _RequestHandler(WSGIRequestHandler):
+    """Werkzeug handler with a socket timeout so slow or idle clients cannot pin a pool thread.
+
+    Werkzeug always answers with Connection: close, so the built-in server has no
+    keep-alive; run with gunicorn installed for persistent connections.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 5.0
+
+
+class PoolWSGIServer(BaseWSGIServer):
+    """Werkzeug server running connections on a fixed thread pool with a bounded wait queue.
+
+    Connections beyond threads + max_queue are answered with 503 straight away
+    instead of piling up behind busy workers.
+    """
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, wsgi_app, threads: int = 8, max_queue: int = 64, **kwargs):
+        super().__init__(host, port, wsgi_app, **kwargs)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="citytime-http")
+        self._slots = threading.BoundedSemaphore(threads + max_queue)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            try:
+                request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\n"
+                                b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        if hasattr(self, "_pool"):
+            self._pool.shutdown(wait=True)
+
+
+# A worker that crashes within WORKER_STABLE_SECONDS of starting is restarted after a delay
+# that doubles per consecutive quick crash; past the limit the master gives up
+WORKER_RESTART_DELAY = (0.5, 30.0)
+WORKER_STABLE_SECONDS = 30.0
+WORKER_MAX_QUICK_CRASHES = 10
+
+
+def _run_worker(listener: socket.socket, host: str, port: int, threads: int, max_queue: int) -> None:
+    """Serve on an inherited listening socket until SIGTERM, then drain in-flight requests."""
+    server = PoolWSGIServer(host, port, app, threads=threads, max_queue=max_queue,
+                            handler=_RequestHandler, fd=listener.fileno())
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    HEADLINES.start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def _reload_caches() -> None:
+    TZ_REGISTRY.invalidate()
+    ALIAS_STORE.invalidate()
+    prewarm()
+
+
+def _serve_gunicorn(host: str, port: int, workers: int, threads: int, max_queue: int, backlog: int,
+                    keepalive: float) -> None:
+    """Run under gunicorn's gthread workers, preloaded so prewarmed caches are shared after fork."""
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        # Connections beyond this per worker wait in the listen backlog
+        "worker_connections": threads + max_queue,
+        "backlog": backlog,
+        "keepalive": max(1, int(keepalive)),
+        "preload_app": True,
+        "graceful_timeout": 30,
+        "post_fork": lambda server, worker: HEADLINES.start(),
+        "on_reload": lambda arbiter: _reload_caches(),
+    }
+
+    class _Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    _Application().run()
+
+
+def serve(host: str = "0.0.0.0", port: int = 5000, workers: int = 2, threads: int = 8, max_queue: int = 64,
+          backlog: int = 128, keepalive: float = 5.0, server: str = "auto") -> None:
+    """Production server: prewarm caches, then prefork workers that share them copy-on-write.
+
+    With gunicorn installed (server="auto" or "gunicorn") its gthread workers are
+    used. Otherwise the built-in server forks workers around a shared listening
+    socket. Either way SIGHUP re-reads aliases and tzdata, prewarms again and
+    replaces the workers (old ones finish in-flight requests) and SIGTERM/SIGINT
+    drains and stops. Built-in workers that crash soon after starting are restarted
+    after a growing delay, and the master exits non-zero once too many crash in a
+    row. Without fork (Windows) a single in-process worker is used.
+    """
+    workers = max(1, workers)
+    if server != "builtin":
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            if server == "gunicorn":
+                raise RuntimeError("gunicorn is not installed (pip install gunicorn)") from None
+        else:
+            prewarm()
+            _serve_gunicorn(host, port, workers, threads, max_queue, backlog, keepalive)
+            return
+    _RequestHandler.timeout = keepalive
+    listener = socket.create_server((host, port), backlog=backlog)
+    listener.set_inheritable(True)
+    # Every worker's select() wakes per connection but only one wins accept(); the rest must
+    # get EAGAIN (socketserver ignores it) rather than block where shutdown() cannot reach them
+    listener.setblocking(False)
+    prewarm()
+    print(f"Starting CityTime web UI at http://localhost:{port} "
+          f"({workers} workers x {threads} threads, queue {max_queue})")
+    if not hasattr(os, "fork"):
+        HEADLINES.start()
+        server = PoolWSGIServer(host, port, app, threads=threads, max_queue=max_queue,
+                                handler=_RequestHandler, fd=listener.fileno())
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        return
+
+    children: dict = {}
+    generation = 0
+    state = {"reload": False, "stop": False, "failed": False}
+    restarts: list = []
+    crashes = 0
+    max_crashes = WORKER_MAX_QUICK_CRASHES * workers
+
+    def spawn() -> None:
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(listener, host, port, threads, max_queue)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = (generation, time.monotonic())
+
+    def on_signal(signum, frame):
+        state["reload" if signum == signal.SIGHUP else "stop"] = True
+
+    for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, on_signal)
+    for _ in range(workers):
+        spawn()
+    while children or restarts:
+        if state["stop"]:
+            state["stop"] = False
+            for pid in children:
+                os.kill(pid, signal.SIGTERM)
+            generation = -1
+            restarts.clear()
+        elif state["reload"]:
+            state["reload"] = False
+            gc.unfreeze()
+            _reload_caches()
+            old = list(children)
+            generation += 1
+            restarts.clear()
+            crashes = 0
+            for _ in range(workers):
+                spawn()
+            for pid in old:
+                os.kill(pid, signal.SIGTERM)
+            print(f"🔄 Reloaded: generation {generation}", file=sys.stderr)
+        while restarts and restarts[0] <= time.monotonic():
+            heapq.heappop(restarts)
+            spawn()
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid == 0:
+            time.sleep(0.2)
+            continue
+        born, started = children.pop(pid, (None, 0.0))
+        if born == generation and generation >= 0 and os.waitstatus_to_exitcode(status) != 0:
+            crashes = crashes + 1 if time.monotonic() - started < WORKER_STABLE_SECONDS else 1
+            if crashes > max_crashes:
+                print(f"❌ Workers crashed {crashes} times in a row shortly after starting; stopping", file=sys.stderr)
+                state["stop"] = state["failed"] = True
+                continue
+            delay = min(WORKER_RESTART_DELAY[1], WORKER_RESTART_DELAY[0] * 2 ** (crashes - 1))
+            print(f"⚠️ Worker {pid} exited unexpectedly; restarting in {delay:.1f}s", file=sys.stderr)
+            heapq.heappush(restarts, time.monotonic() + delay)
+    listener.close()
+    if state["failed"]:
+        sys.exit(1)
+
+
+def main(argv=None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="CityTime web UI")
+    parser.add_argument("--debug", action="store_true", default=os.environ.get("CITYTIME_DEBUG") == "1",
+                        help="Werkzeug dev server with the debugger and reloader (never expose publicly)")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    sub = parser.add_subparsers(dest="command")
+    prod = sub.add_parser("serve", help="Production server with preforked, prewarmed workers")
+    prod.add_argument("--workers", type=int, default=int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1)))
+    prod.add_argument("--threads", type=int, default=int(os.environ.get("WEB_THREADS", 8)))
+    prod.add_argument("--max-queue", type=int, default=64, help="Connections allowed to wait for a thread before 503s")
+    prod.add_argument("--backlog", type=int, default=128, help="Listen backlog")
+    prod.add_argument("--keepalive", type=float, default=5.0,
+                      help="Idle keep-alive timeout in seconds (socket timeout for the built-in server)")
+    prod.add_argument("--server", choices=("auto", "gunicorn", "builtin"), default="auto",
+                      help="Use gunicorn when installed (auto), require it, or use the built-in prefork server")
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        try:
+            serve(args.host, args.port, args.workers, args.threads, args.max_queue, args.backlog, args.keepalive,
+                  args.server)
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    print(f"Starting CityTime web UI at http://localhost:{args.port}")
+    HEADLINES.start()
+    app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
 
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))
-    print(f"Starting CityTime web UI at http://localhost:{port}")
-    app.run(host="0.0.0.0", port=port, debug=True)
+    main()
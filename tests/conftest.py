@@ -0,0 +1,8 @@
+"""Test setup: import the modules from this checkout with a throwaway HOME for alias files."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="citytime-tests-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,85 @@
+"""Alias backends: SQLite storage, legacy import, indexed lookups, and key=value export/import round trips."""
+import sqlite3
+
+import pytest
+
+import citytime
+from citytime import AliasStore, FileAliasBackend, SQLiteAliasBackend
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "file":
+        backend = FileAliasBackend(str(tmp_path / "aliases"))
+    else:
+        backend = SQLiteAliasBackend(str(tmp_path / "aliases.db"))
+    alias_store = AliasStore(backend)
+    monkeypatch.setattr(citytime, "ALIAS_STORE", alias_store)
+    return alias_store
+
+
+def test_sqlite_uses_wal_and_upserts(tmp_path):
+    path = tmp_path / "aliases.db"
+    backend = SQLiteAliasBackend(str(path))
+    assert backend.stamp() == (0,)
+    assert backend.write([("qwertyville", "America/Chicago"), ("gotham", "America/New_York")]) == (0, (1,))
+    assert backend.write([("qwertyville", "America/Denver"), ("gotham", "")]) == (1, (2,))
+    assert backend.load() == ({"qwertyville": "America/Denver"}, 0)
+    assert backend.lookup("qwertyville") == "America/Denver"
+    assert backend.lookup("gotham") is None
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT norm FROM aliases").fetchall() == [("qwertyville",)]
+
+
+def test_sqlite_imports_the_legacy_file_once(tmp_path):
+    legacy = tmp_path / "aliases"
+    legacy.write_text("qwertyville=America/Chicago\ngotham=America/New_York\ngotham=\n")
+    backend = SQLiteAliasBackend(str(tmp_path / "aliases.db"), legacy_path=str(legacy))
+    assert backend.load()[0] == {"qwertyville": "America/Chicago"}
+    legacy.write_text("metropolis=America/Chicago\n")
+    reopened = SQLiteAliasBackend(str(tmp_path / "aliases.db"), legacy_path=str(legacy))
+    assert reopened.load()[0] == {"qwertyville": "America/Chicago"}
+
+
+def test_sqlite_search_matches_key_and_canonical_prefixes(tmp_path):
+    backend = SQLiteAliasBackend(str(tmp_path / "aliases.db"))
+    backend.write([("san-jose", "America/Costa_Rica"), ("santa fe", "America/Denver"), ("oslo", "Europe/Oslo")])
+    assert backend.search("san") == [("san-jose", "America/Costa_Rica"), ("santa fe", "America/Denver")]
+    assert backend.search("sanj") == [("san-jose", "America/Costa_Rica")]
+    assert backend.search("santa-f") == [("santa fe", "America/Denver")]
+    assert backend.search("x") == []
+
+
+def test_indexed_store_answers_without_loading(tmp_path):
+    store = AliasStore(SQLiteAliasBackend(str(tmp_path / "aliases.db")))
+    store.put("qwertyville", "America/Chicago")
+    assert store.lookup("qwertyville") == "America/Chicago"
+    assert store.lookup("tokyo") == citytime.load_aliases().get("tokyo")
+    assert store.delete("qwertyville")
+    assert store.lookup("qwertyville") is None
+    assert store.reloads == 0
+
+
+def test_export_import_round_trip(store, tmp_path, capsys):
+    store.put_many({"qwertyville": "America/Chicago", "zulu": "UTC", "gotham": "America/New_York"})
+    store.delete("gotham")
+    exported = tmp_path / "export.txt"
+    citytime.export_aliases(str(exported))
+    assert exported.read_text() == "qwertyville=America/Chicago\nzulu=UTC\n"
+
+    fresh = AliasStore(FileAliasBackend(str(tmp_path / "fresh")))
+    citytime.ALIAS_STORE = fresh
+    citytime.import_aliases(str(exported))
+    assert fresh.user_aliases() == {"qwertyville": "America/Chicago", "zulu": "UTC"}
+
+
+def test_import_applies_tombstones_and_skips_unknown_zones(store, tmp_path, capsys):
+    store.put_many({"qwertyville": "America/Chicago", "gotham": "America/New_York"})
+    source = tmp_path / "import.txt"
+    source.write_text("gotham=\nmetropolis=Nowhere/Land\nshelbyville=America/Chicago\n")
+    citytime.import_aliases(str(source))
+    assert store.user_aliases() == {"qwertyville": "America/Chicago", "shelbyville": "America/Chicago"}
+    captured = capsys.readouterr()
+    assert "Imported 1 aliases, removed 1" in captured.out
+    assert "metropolis" in captured.err
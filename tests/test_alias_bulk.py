@@ -0,0 +1,56 @@
+"""Bulk alias updates: one validated backend write per batch."""
+import pytest
+
+import citytime
+from citytime import AliasStore, FileAliasBackend, remove_aliases, save_aliases, update_aliases
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    alias_store = AliasStore(FileAliasBackend(str(tmp_path / "aliases")))
+    monkeypatch.setattr(citytime, "ALIAS_STORE", alias_store)
+    return alias_store
+
+
+def test_bulk_save_and_remove_is_a_single_write(store, tmp_path):
+    path = tmp_path / "aliases"
+    assert save_aliases({"Qwertyville": "Europe/Oslo", "asdfton": "Asia/Tokyo", "zxcvburg": "America/Lima"}) == 3
+    assert store.backend.generation() == 1
+    assert update_aliases({"uiopham": "Africa/Cairo", "asdfton": "Asia/Seoul"}, ["zxcvburg", "nowhere", "ASDFTON"]) == (
+        2, ["zxcvburg", "asdfton"])
+    assert store.backend.generation() == 2
+    assert remove_aliases(["qwertyville", "uiopham", "nowhere"]) == ["qwertyville", "uiopham"]
+    assert store.backend.generation() == 3
+    assert remove_aliases(["nowhere"]) == []
+    assert store.backend.generation() == 3
+    assert len(path.read_text().splitlines()) == 3 + 4 + 2
+    assert store.user_aliases() == {}
+    assert AliasStore(FileAliasBackend(str(path))).user_aliases() == {}
+
+
+@pytest.mark.parametrize("mapping", [
+    {"qwertyville": "Europe/Oslo", "asdfton": "Not/AZone"},
+    {"qwertyville": "Europe/Oslo", "asdfton": "UTC"},
+    {"qwertyville": "Europe/Oslo", "": "Asia/Tokyo"},
+])
+def test_invalid_batch_writes_nothing(store, tmp_path, mapping):
+    save_aliases({"zxcvburg": "America/Lima"})
+    with pytest.raises(ValueError):
+        update_aliases(mapping, ["zxcvburg"])
+    assert store.backend.generation() == 1
+    assert (tmp_path / "aliases").read_text() == "zxcvburg=America/Lima\n"
+    assert store.user_aliases() == {"zxcvburg": "America/Lima"}
+
+
+def test_bulk_api(store):
+    citytime_web = pytest.importorskip("citytime_web")
+    client = citytime_web.app.test_client()
+    reply = client.post("/api/aliases/bulk", json={"aliases": {" Qwertyville ": " Europe/Oslo "}, "remove": ["nowhere"]})
+    assert reply.status_code == 200
+    assert reply.get_json() == {"ok": True, "saved": 1, "removed": []}
+    reply = client.post("/api/aliases/bulk", json={"aliases": {"asdfton": "Not/AZone"}, "remove": ["qwertyville"]})
+    assert reply.status_code == 400
+    assert "Not/AZone" in reply.get_json()["error"]
+    assert client.post("/api/aliases/bulk", json={"aliases": ["qwertyville"]}).status_code == 400
+    assert store.user_aliases() == {"qwertyville": "Europe/Oslo"}
+    assert store.backend.generation() == 1
@@ -0,0 +1,48 @@
+"""Several processes writing and compacting one alias journal lose nothing and see each other's writes."""
+import multiprocessing
+import os
+
+import pytest
+
+from citytime import AliasStore, FileAliasBackend
+
+PROCESSES = 6
+WRITES = 120
+COMPACT_EVERY = 30
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+
+
+def _worker(path, n, barrier, results):
+    store = AliasStore(FileAliasBackend(path))
+    store.aliases()
+    barrier.wait()
+    for i in range(WRITES):
+        store.put(f"proc{n}-alias{i}", "Europe/Oslo")
+        if i % COMPACT_EVERY == COMPACT_EVERY - 1:
+            store.compact()
+    barrier.wait()
+    # Every process has finished writing: a refresh must pick all of it up via the generation counter
+    user = store.user_aliases()
+    results.put((n, sum(1 for key in user if key.startswith("proc")), store.backend.generation()))
+
+
+def test_concurrent_writes_and_compactions_lose_nothing(tmp_path):
+    path = str(tmp_path / "aliases")
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(PROCESSES)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(path, n, barrier, results)) for n in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    seen = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    total = PROCESSES * WRITES
+    generations = PROCESSES * (WRITES + WRITES // COMPACT_EVERY)
+    assert sorted(seen) == [(n, total, generations) for n in range(PROCESSES)]
+    user, _ = FileAliasBackend(path).load()
+    assert len(user) == total
+    assert os.path.exists(path + ".gen")
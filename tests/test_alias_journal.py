@@ -0,0 +1,73 @@
+"""The alias file as an append-only journal: replay, tombstones and compaction."""
+import os
+
+from citytime import DEFAULT_ALIASES, AliasStore, FileAliasBackend
+
+
+def _store(tmp_path):
+    return AliasStore(FileAliasBackend(str(tmp_path / "aliases")))
+
+
+def test_writes_append_and_replay_last_write_wins(tmp_path):
+    store = _store(tmp_path)
+    store.put("qwertyville", "Europe/Oslo")
+    store.put("qwertyville", "Europe/Rome")
+    store.put_many({"asdfton": "Asia/Tokyo", "zxcvburg": "America/Lima"})
+    assert store.delete("asdfton")
+    assert not store.delete("asdfton")
+    path = tmp_path / "aliases"
+    assert path.read_text().splitlines() == [
+        "qwertyville=Europe/Oslo", "qwertyville=Europe/Rome", "asdfton=Asia/Tokyo", "zxcvburg=America/Lima",
+        "asdfton=",
+    ]
+    user, dead = FileAliasBackend(str(path)).load()
+    assert user == {"qwertyville": "Europe/Rome", "zxcvburg": "America/Lima"}
+    assert dead == 3
+    assert _store(tmp_path).user_aliases() == user
+
+
+def test_replay_ignores_junk_and_appends_after_an_unterminated_line(tmp_path):
+    path = tmp_path / "aliases"
+    path.write_text("# comment\nnot an alias\n=Europe/Oslo\nqwertyville=Europe/Oslo")
+    store = _store(tmp_path)
+    assert store.user_aliases() == {"qwertyville": "Europe/Oslo"}
+    store.put("asdfton", "Asia/Tokyo")
+    assert path.read_text().endswith("qwertyville=Europe/Oslo\nasdfton=Asia/Tokyo\n")
+    assert _store(tmp_path).user_aliases() == {"qwertyville": "Europe/Oslo", "asdfton": "Asia/Tokyo"}
+
+
+def test_tombstone_restores_the_builtin_alias(tmp_path):
+    key, builtin = next(iter(DEFAULT_ALIASES.items()))
+    other = "Asia/Tokyo" if builtin != "Asia/Tokyo" else "Europe/Oslo"
+    store = _store(tmp_path)
+    store.put(key, other)
+    assert store.aliases()[key] == other
+    assert store.delete(key)
+    assert store.aliases()[key] == builtin
+    assert _store(tmp_path).aliases()[key] == builtin
+
+
+def test_compaction_keeps_live_aliases_and_file_mode(tmp_path):
+    store = _store(tmp_path)
+    for i in range(50):
+        store.put("qwertyville", f"Etc/GMT+{i % 12}")
+    store.put("asdfton", "Asia/Tokyo")
+    store.delete("asdfton")
+    path = tmp_path / "aliases"
+    os.chmod(path, 0o600)
+    store.compact()
+    assert path.read_text() == "qwertyville=Etc/GMT+1\n"
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    assert _store(tmp_path).user_aliases() == {"qwertyville": "Etc/GMT+1"}
+
+
+def test_compaction_runs_automatically_once_dead_lines_dominate(tmp_path):
+    store = _store(tmp_path)
+    for i in range(AliasStore.COMPACT_MIN_DEAD + 10):
+        store.put("qwertyville", f"Etc/GMT+{i % 12}")
+    if store._compactor is not None:
+        store._compactor.join()
+    lines = (tmp_path / "aliases").read_text().splitlines()
+    assert len(lines) < AliasStore.COMPACT_MIN_DEAD
+    assert _store(tmp_path).user_aliases() == store.user_aliases()
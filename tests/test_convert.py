@@ -0,0 +1,58 @@
+"""Bulk timestamp conversion rejects epochs it cannot represent instead of crashing or emitting garbage."""
+import io
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+import citytime
+
+
+@pytest.mark.parametrize("epoch", [1e20, 1e15, -1e15, math.nan, math.inf, -math.inf, 10**20])
+def test_convert_timestamps_rejects_unrepresentable_epochs(epoch):
+    with pytest.raises(ValueError):
+        citytime.convert_timestamps([0, epoch], "America/Chicago")
+
+
+def test_convert_timestamps_accepts_the_range_limits():
+    limits = [citytime.CONVERT_EPOCH_MIN, citytime.CONVERT_EPOCH_MAX]
+    result = citytime.convert_timestamps(limits, "America/Chicago")
+    assert result["valid"].all()
+    assert np.datetime_as_string(result["local"], unit="s").tolist() == ["0001-01-01T18:09:24", "9999-12-30T17:59:59"]
+
+
+def test_convert_file_skips_bad_lines(tmp_path, capsys):
+    path = tmp_path / "events.csv"
+    path.write_text("1e20,America/Chicago\nnan,America/Chicago\n0,America/Chicago\ninf,Europe/Paris\nabc,Europe/Paris\n")
+    out = io.StringIO()
+    citytime.convert_file(str(path), out)
+    assert out.getvalue().splitlines() == [
+        "epoch,zone,timezone,local_time,utc_offset,dst",
+        "0,America/Chicago,America/Chicago,1969-12-31T18:00:00,UTC-06:00,0",
+    ]
+    assert "4 lines skipped" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("timestamps, error", [
+    ([1e20], "years 1-9999"),
+    ([1e15], "years 1-9999"),
+    ([10**20], "years 1-9999"),
+    ([True], "must be numbers"),
+    (["5"], "must be numbers"),
+])
+def test_api_convert_rejects_bad_timestamps(timestamps, error):
+    pytest.importorskip("flask")
+    import citytime_web
+    response = citytime_web.app.test_client().post("/api/convert",
+                                                   json={"timestamps": timestamps, "zone": "America/Chicago"})
+    assert response.status_code == 400
+    assert error in response.get_json()["error"]
+
+
+def test_api_convert_rejects_nan():
+    pytest.importorskip("flask")
+    import citytime_web
+    response = citytime_web.app.test_client().post("/api/convert", data='{"timestamps": [NaN], "zone": "UTC"}',
+                                                   content_type="application/json")
+    assert response.status_code == 400
+    assert "finite" in response.get_json()["error"]
@@ -0,0 +1,134 @@
+"""HeadlineFeed against a local stub RSS server: early refresh, failure backoff and single-flight fetches."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("flask")
+from citytime_web import HeadlineFeed
+
+
+class StubFeed:
+    """A local RSS endpoint whose title, status and latency tests can change while it runs."""
+
+    def __init__(self):
+        self.title = "First"
+        self.status = 200
+        self.delay = 0.0
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(time.monotonic())
+                time.sleep(stub.delay)
+                body = (f"<rss><channel><item><title>{stub.title} - Wire</title>"
+                        f"<link>http://example.invalid/{stub.title}</link></item></channel></rss>").encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/rss"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubFeed()
+    yield server
+    server.close()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_refreshes_before_expiry_without_blocking_readers(stub):
+    feed = HeadlineFeed(stub.url, ttl=1.0, refresh_ahead=0.7, timeout=2)
+    try:
+        assert feed.get() == []
+        _wait_for(lambda: feed.get())
+        first_at = time.monotonic()
+        assert feed.get() == [{"title": "First", "url": "http://example.invalid/First"}]
+
+        stub.title = "Second"
+        _wait_for(lambda: feed.get()[0]["title"] == "Second")
+        assert time.monotonic() - first_at < feed.ttl
+        assert not feed.stats()["stale"]
+        assert feed.stats()["errors"] == 0
+    finally:
+        feed.stop()
+
+
+def test_failures_back_off_exponentially_and_keep_serving_stale_data(stub):
+    feed = HeadlineFeed(stub.url, ttl=0.1, refresh_ahead=0, timeout=2, min_backoff=0.2, max_backoff=0.8)
+    assert feed.refresh()
+    stub.status = 500
+    delays = []
+    for _ in range(5):
+        assert not feed.refresh()
+        delays.append(round(feed._next_attempt - time.monotonic(), 1))
+    assert delays == [0.2, 0.4, 0.8, 0.8, 0.8]
+    time.sleep(0.1)
+    stats = feed.stats()
+    assert stats["failures"] == 5 and stats["errors"] == 5 and stats["stale"]
+    assert feed.get()[0]["title"] == "First"
+    feed.stop()
+
+    # The background refresher honours the backoff instead of retrying in a tight loop
+    stub.requests.clear()
+    feed = HeadlineFeed(stub.url, timeout=2, min_backoff=0.2, max_backoff=0.8)
+    try:
+        feed.start()
+        time.sleep(1.0)
+    finally:
+        feed.stop()
+    assert 2 <= len(stub.requests) <= 4
+    gaps = [b - a for a, b in zip(stub.requests, stub.requests[1:])]
+    assert all(gap >= 0.15 for gap in gaps)
+
+
+def test_concurrent_refreshes_share_one_fetch(stub):
+    stub.delay = 0.3
+    feed = HeadlineFeed(stub.url, timeout=2)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def refresh():
+        barrier.wait()
+        results.append(feed.refresh())
+
+    threads = [threading.Thread(target=refresh) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(stub.requests) == 1
+    assert sorted(results) == [False] * 7 + [True]
+
+    # Many cold readers start one refresher, which makes one request
+    stub.requests.clear()
+    feed = HeadlineFeed(stub.url, timeout=2)
+    try:
+        readers = [threading.Thread(target=feed.get) for _ in range(16)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        _wait_for(lambda: feed.get())
+        assert len(stub.requests) == 1
+    finally:
+        feed.stop()
@@ -0,0 +1,75 @@
+"""find_timezone_matches (n-gram indexed) returns what the original linear scan returned."""
+import os
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from citytime import CITY_DATABASE, TZ_REGISTRY, find_timezone_matches
+
+
+def _norm(text: str) -> str:
+    return text.lower().replace('-', '').replace('_', '').replace(' ', '').replace('.', '')
+
+
+def _similarity(city: str, tz: str) -> float:
+    return SequenceMatcher(None, _norm(city), os.path.basename(tz).lower().replace('-', '').replace('_', '')).ratio()
+
+
+def reference_matches(city: str):
+    """The original implementation: a scan of CITY_DATABASE, then of every zone basename."""
+    city_normalized = _norm(city)
+    if city_normalized in CITY_DATABASE:
+        return [(CITY_DATABASE[city_normalized], 1.0)]
+    unique_matches = {}
+    for db_city, tz in CITY_DATABASE.items():
+        db_city_norm = _norm(db_city)
+        if city_normalized in db_city_norm or db_city_norm in city_normalized:
+            score = _similarity(city, db_city)
+            if tz not in unique_matches or unique_matches[tz] < score:
+                unique_matches[tz] = score
+    if unique_matches:
+        return sorted(unique_matches.items(), key=lambda x: x[1], reverse=True)
+    matches = []
+    for tz in TZ_REGISTRY.sorted():
+        tz_city = os.path.basename(tz).lower().replace('-', '').replace('_', '')
+        if city_normalized == tz_city:
+            matches.append((tz, 1.0))
+        else:
+            score = _similarity(city, tz)
+            if city_normalized in tz_city or tz_city in city_normalized or score >= 0.7:
+                matches.append((tz, score))
+    matches.sort(key=lambda x: x[1], reverse=True)
+    return matches
+
+
+def _queries():
+    rng = random.Random(5)
+    names = sorted(CITY_DATABASE) + sorted({os.path.basename(tz).replace('_', ' ') for tz in TZ_REGISTRY.sorted()})
+    queries = ["", "a", "xq", "new", "san", "port", "los angeles", "Ho Chi Minh", "st. john's", "zzzzzz"]
+    for name in rng.sample(names, 300):
+        queries.append(name)
+        i = rng.randrange(len(name))
+        queries.append(name[:i] + rng.choice("aeioxz") + name[i + 1:])
+        queries.append(name[i:i + rng.randint(2, 6)])
+        queries.append(name + rng.choice(["ville", " city", "x"]))
+    return queries
+
+
+def _canonical(matches):
+    return sorted((tz, round(score, 12)) for tz, score in matches)
+
+
+@pytest.mark.parametrize("chunk", range(4))
+def test_matches_reference_scan(chunk):
+    queries = _queries()[chunk::4]
+    differences = [(q, find_timezone_matches(q)[:5], reference_matches(q)[:5]) for q in queries
+                   if _canonical(find_timezone_matches(q)) != _canonical(reference_matches(q))]
+    assert not differences, differences[:5]
+
+
+def test_best_match_order_matches_reference():
+    for query in ["paris", "san fran", "kolkatta", "new yrok", "buenos"]:
+        ours, expected = find_timezone_matches(query), reference_matches(query)
+        assert [score for _, score in ours] == pytest.approx([score for _, score in expected])
+        assert ours[:1] == expected[:1]
@@ -0,0 +1,71 @@
+"""plan_overlap agrees with a 15-minute brute-force scan of every city's local working hours."""
+import random
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from citytime import TZ_REGISTRY, parse_hours, parse_weekdays, plan_overlap
+
+STEP = 15 * 60
+
+
+def _working(zone: ZoneInfo, epoch: int, window, days, first: date, last: date) -> bool:
+    local = datetime.fromtimestamp(epoch, zone)
+    seconds = local.hour * 3600 + local.minute * 60 + local.second
+    for day, offset in ((local.date(), 0), (local.date() - timedelta(days=1), 86400)):
+        if first <= day <= last and day.weekday() in days and window[0] <= seconds + offset < window[1]:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_slots_match_brute_force_scan(seed):
+    rng = random.Random(seed)
+    zones = [zone for zone in TZ_REGISTRY.sorted() if '/' in zone and not zone.startswith("Etc/")]
+    cities = rng.sample(zones, 5)
+    hours = rng.choice(["09:00-17:00", "08:30-18:15", "22:00-06:00"])
+    hours_by_city = {cities[0]: rng.choice(["07:00-15:45", "12:00-20:00", "20:00-04:00"])}
+    weekdays = rng.choice(["mon-fri", "sun-thu", "mon,wed,fri"])
+    # Spans spring and autumn DST changes on both hemispheres
+    first = date(2026, rng.choice([3, 9, 10]), rng.randint(1, 20))
+    last = first + timedelta(days=rng.randint(20, 45))
+
+    plan = plan_overlap(cities, first, last, hours, hours_by_city, weekdays, min_minutes=15, min_cities=1,
+                        limit=100_000)
+    slots = sorted(plan["slots"], key=lambda slot: slot["start_epoch"])
+    days = set(parse_weekdays(weekdays))
+    windows = {city: parse_hours(hours_by_city.get(city, hours)) for city in cities}
+    zoneinfos = {city: ZoneInfo(city) for city in cities}
+
+    begin = int(datetime(first.year, first.month, first.day, tzinfo=timezone.utc).timestamp()) - 2 * 86400
+    end = int(datetime(last.year, last.month, last.day, tzinfo=timezone.utc).timestamp()) + 3 * 86400
+    i = 0
+    checked = 0
+    for epoch in range(begin, end, STEP):
+        expected = {city for city in cities if _working(zoneinfos[city], epoch, windows[city], days, first, last)}
+        while i < len(slots) and slots[i]["end_epoch"] <= epoch:
+            i += 1
+        if i < len(slots) and slots[i]["start_epoch"] <= epoch:
+            available = set(cities) - set(slots[i]["missing"])
+            assert (epoch, available) == (epoch, expected)
+            assert slots[i]["attendance"] == len(expected)
+            checked += 1
+        else:
+            assert (epoch, set()) == (epoch, expected)
+    assert checked
+
+
+def test_rejects_non_string_hours():
+    with pytest.raises(ValueError):
+        plan_overlap(["Europe/Paris", "America/Chicago"], date(2026, 1, 5), date(2026, 1, 9),
+                     hours_by_city={"America/Chicago": 5})
+
+
+@pytest.mark.parametrize("hours_by_city", [{"chicago": 5}, {"chicago": None}, {"chicago": "25:00-26:00"}])
+def test_api_rejects_bad_hours_by_city(hours_by_city):
+    pytest.importorskip("flask")
+    import citytime_web
+    response = citytime_web.app.test_client().post("/api/overlap", json={"cities": ["chicago", "paris"],
+                                                                         "hours_by_city": hours_by_city})
+    assert response.status_code == 400
@@ -0,0 +1,40 @@
+"""Sampled request profiling: kept profiles stay downloadable after being viewed."""
+import pstats
+
+import pytest
+
+pytest.importorskip("flask")
+import citytime_web
+
+SECRET = "test-secret"
+HEADERS = {citytime_web.RequestProfiler.HEADER: SECRET}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(citytime_web, "PROFILER", citytime_web.RequestProfiler(SECRET, rate=0.0))
+    return citytime_web.app.test_client()
+
+
+def test_binary_download_survives_text_report(client, tmp_path):
+    assert client.get("/api/time/tokyo", headers=HEADERS).status_code == 200
+    profiles = client.get("/admin/profiles", headers=HEADERS).get_json()["profiles"]
+    url = f"/admin/profiles/{profiles[0]['id']}"
+
+    before = client.get(url, headers=HEADERS).data
+    report = client.get(url + "?format=text", headers=HEADERS)
+    assert report.status_code == 200
+    assert b"api_get_time" in report.data
+    assert client.get(url + "?format=text&sort=bogus", headers=HEADERS).status_code == 400
+    after = client.get(url, headers=HEADERS).data
+
+    assert after == before
+    path = tmp_path / "request.prof"
+    path.write_bytes(after)
+    stats = pstats.Stats(str(path))
+    assert stats.total_calls > 0
+    assert any(func[2] == "api_get_time" for func in stats.stats)
+
+
+def test_profiles_hidden_without_secret(client):
+    assert client.get("/admin/profiles").status_code == 404
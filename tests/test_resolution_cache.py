@@ -0,0 +1,73 @@
+"""ResolutionCache: dropped when aliases change, negative entries expire after their TTL."""
+import time
+
+import pytest
+
+import citytime
+from citytime import AliasStore, FileAliasBackend, Resolution, ResolutionCache
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    alias_store = AliasStore(FileAliasBackend(str(tmp_path / "aliases")))
+    monkeypatch.setattr(citytime, "ALIAS_STORE", alias_store)
+    return alias_store
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def counting(calls):
+    def resolver(city, fuzzy):
+        calls.append(city)
+        return citytime._resolve_uncached(city, fuzzy)
+    return resolver
+
+
+def test_alias_change_invalidates_cached_resolutions(store):
+    cache, calls = ResolutionCache(), []
+    resolver = counting(calls)
+    assert cache.resolve("qwertyville", False, resolver) is None
+    assert cache.resolve("qwertyville", False, resolver) is None
+    assert len(calls) == 1
+
+    store.put("qwertyville", "Europe/Oslo")
+    assert cache.resolve("qwertyville", False, resolver) == Resolution("Europe/Oslo", "alias", 1.0)
+    assert cache.resolve("qwertyville", False, resolver).timezone == "Europe/Oslo"
+    assert len(calls) == 2
+
+    store.put("qwertyville", "Asia/Tokyo")
+    assert cache.resolve("qwertyville", False, resolver).timezone == "Asia/Tokyo"
+    store.delete("qwertyville")
+    assert cache.resolve("qwertyville", False, resolver) is None
+    assert len(calls) == 4
+    assert cache.stats()["hits"] == 2
+
+
+def test_alias_change_from_another_process_invalidates(store, tmp_path):
+    cache, calls = ResolutionCache(), []
+    assert cache.resolve("qwertyville", False, counting(calls)) is None
+    AliasStore(FileAliasBackend(str(tmp_path / "aliases"))).put("qwertyville", "Europe/Oslo")
+    assert cache.resolve("qwertyville", False, counting(calls)).timezone == "Europe/Oslo"
+    assert len(calls) == 2
+
+
+def test_negative_entries_expire_but_hits_do_not(store, clock):
+    cache, calls = ResolutionCache(negative_ttl=30.0), []
+    resolver = counting(calls)
+    assert cache.resolve("qwertyville", False, resolver) is None
+    assert cache.resolve("Europe/Oslo", False, resolver).timezone == "Europe/Oslo"
+    clock[0] += 29.0
+    assert cache.resolve("qwertyville", False, resolver) is None
+    assert len(calls) == 2
+    clock[0] += 2.0
+    assert cache.resolve("qwertyville", False, resolver) is None
+    assert cache.resolve("Europe/Oslo", False, resolver).timezone == "Europe/Oslo"
+    assert calls == ["qwertyville", "Europe/Oslo", "qwertyville"]
+    clock[0] += 29.0
+    assert cache.resolve("qwertyville", False, resolver) is None
+    assert len(calls) == 3
@@ -0,0 +1,92 @@
+"""Built-in prefork server: crash backoff, and clean shutdown of workers sharing the listening socket."""
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flask")
+import citytime_web
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+
+
+@pytest.fixture(autouse=True)
+def restore_signals():
+    saved = {signum: signal.getsignal(signum) for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT)}
+    yield
+    for signum, handler in saved.items():
+        signal.signal(signum, handler)
+
+
+def test_crashing_workers_back_off_and_stop_the_master(monkeypatch, capsys):
+    def crash(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(citytime_web, "_run_worker", crash)
+    monkeypatch.setattr(citytime_web, "prewarm", lambda: None)
+    monkeypatch.setattr(citytime_web, "WORKER_RESTART_DELAY", (0.05, 0.4))
+    monkeypatch.setattr(citytime_web, "WORKER_MAX_QUICK_CRASHES", 3)
+
+    started = time.monotonic()
+    with pytest.raises(SystemExit) as exit_info:
+        citytime_web.serve("127.0.0.1", 0, workers=2, server="builtin")
+    elapsed = time.monotonic() - started
+
+    assert exit_info.value.code == 1
+    err = capsys.readouterr().err
+    delays = [float(delay) for delay in re.findall(r"restarting in ([\d.]+)s", err)]
+    assert len(delays) == 6
+    assert delays == sorted(delays) and delays[-1] == 0.4
+    assert "stopping" in err
+    assert elapsed >= sum(delays[:-1]) / 2
+    assert elapsed < 10
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            return resp.status
+    except OSError:
+        return 0
+
+
+def test_sigterm_stops_master_after_reload_under_concurrent_load(tmp_path):
+    port = _free_port()
+    env = dict(os.environ, HOME=str(tmp_path), CITYTIME_HEADLINES_URL="http://127.0.0.1:9/")
+    script = Path(citytime_web.__file__).resolve()
+    master = subprocess.Popen([sys.executable, str(script), "--host", "127.0.0.1", "--port", str(port), "serve",
+                               "--server", "builtin", "--workers", "3", "--threads", "2"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    url = f"http://127.0.0.1:{port}/api/time/tokyo"
+    try:
+        deadline = time.monotonic() + 60
+        while _get(url) != 200:
+            assert master.poll() is None and time.monotonic() < deadline, "server did not come up"
+            time.sleep(0.2)
+        # A burst wakes every worker but only one wins each accept(); the losers must not block in it
+        for _ in range(2):
+            master.send_signal(signal.SIGHUP)
+            time.sleep(1.0)
+            with ThreadPoolExecutor(max_workers=40) as pool:
+                statuses = list(pool.map(_get, [url] * 40))
+            assert statuses.count(200) >= 20
+        master.send_signal(signal.SIGTERM)
+        assert master.wait(timeout=20) == 0
+    finally:
+        if master.poll() is None:
+            os.killpg(master.pid, signal.SIGKILL)
+            master.wait()
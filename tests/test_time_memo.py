@@ -0,0 +1,32 @@
+"""The /api/time per-second memo never serves a body built for another second."""
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+import citytime_web
+
+
+@pytest.fixture
+def memo():
+    with citytime_web.app.test_request_context():
+        yield citytime_web.SecondMemo()
+
+
+def test_late_build_for_an_older_second_is_not_served(memo):
+    memo.build("Asia/Tokyo", 1_000_001)
+    memo.build("Asia/Tokyo", 1_000_000)
+    memo.build("Europe/Paris", 1_000_000)
+    assert memo.get("Asia/Tokyo", 1_000_001) is not None
+    assert memo.get("Asia/Tokyo", 1_000_000) is None
+    assert memo.get("Europe/Paris", 1_000_001) is None
+
+
+def test_spliced_body_matches_jsonify(memo):
+    head, tail = memo.build("Asia/Tokyo", 1_000_000)
+    city = 'To"ky\\o 東京'
+    body = head + citytime_web.app.json.dumps(city).encode() + tail
+    data = json.loads(body)
+    assert data["city"] == city
+    assert data["iso"] == "1970-01-12T22:46:40+09:00"
+    assert citytime_web.jsonify(data).get_data() == body
@@ -0,0 +1,75 @@
+"""TypeaheadIndex: ranking against a brute-force scan, and staying in sync with alias changes."""
+import random
+
+import pytest
+
+from citytime import DEFAULT_ALIASES, AliasStore, FileAliasBackend, TypeaheadIndex
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AliasStore(FileAliasBackend(str(tmp_path / "aliases")))
+
+
+def brute_force(mapping, query, limit=15, offset=0):
+    names = sorted(mapping)
+    if not query:
+        found = [(name, TypeaheadIndex.SUBSTRING) for name in names]
+    else:
+        found = [(query, TypeaheadIndex.EXACT)] if query in mapping else []
+        found += [(name, TypeaheadIndex.PREFIX) for name in names if name.startswith(query) and name != query]
+        found += [(name, TypeaheadIndex.SUBSTRING) for name in names if query in name and not name.startswith(query)]
+    return [(name, mapping[name], score) for name, score in found][offset:offset + limit]
+
+
+def queries(mapping, rng):
+    names = sorted(mapping)
+    out = ["", "zz", "q", "qu", "xyzzy"]
+    for _ in range(200):
+        name = rng.choice(names)
+        size = rng.randint(1, min(6, len(name)))
+        start = rng.randint(0, len(name) - size)
+        out.append(name[start:start + size])
+    return out
+
+
+def test_search_matches_brute_force_including_short_queries(store):
+    index = TypeaheadIndex(store)
+    mapping = store.aliases()
+    rng = random.Random(3)
+    for query in queries(mapping, rng):
+        for limit, offset in ((15, 0), (5, 3), (1000, 0)):
+            assert index.search(query, limit, offset) == brute_force(mapping, query, limit, offset), query
+
+
+def test_index_follows_puts_overrides_and_deletes(store):
+    index = TypeaheadIndex(store)
+    assert index.search("qwer") == []
+    store.put("qwertyville", "Europe/Oslo")
+    store.put_many({"aqwer": "Asia/Tokyo", "qw": "America/Lima"})
+    assert index.search("qw") == [
+        ("qw", "America/Lima", TypeaheadIndex.EXACT), ("qwertyville", "Europe/Oslo", TypeaheadIndex.PREFIX),
+        ("aqwer", "Asia/Tokyo", TypeaheadIndex.SUBSTRING),
+    ]
+    store.put("qwertyville", "Europe/Rome")
+    store.delete_many(["aqwer", "qw"])
+    assert index.search("qw") == [("qwertyville", "Europe/Rome", TypeaheadIndex.PREFIX)]
+    assert index.search("w") == brute_force(store.aliases(), "w")
+
+    key, builtin = next(iter(DEFAULT_ALIASES.items()))
+    other = "Asia/Tokyo" if builtin != "Asia/Tokyo" else "Europe/Oslo"
+    store.put(key, other)
+    assert (key, other, TypeaheadIndex.EXACT) in index.search(key)
+    store.delete(key)
+    assert (key, builtin, TypeaheadIndex.EXACT) in index.search(key)
+
+
+def test_index_rebuilds_after_changes_from_another_process(store, tmp_path):
+    index = TypeaheadIndex(store)
+    index.search("a")
+    other = AliasStore(FileAliasBackend(str(tmp_path / "aliases")))
+    other.put_many({f"qwerty{i}": "Europe/Oslo" for i in range(AliasStore.CHANGELOG_MAX_BATCH + 1)})
+    other.delete("qwerty7")
+    assert "qwerty7" not in other.aliases()
+    assert index.search("qwerty7", limit=100) == brute_force(other.aliases(), "qwerty7", limit=100)
+    assert index.search("ty", limit=2000) == brute_force(store.aliases(), "ty", limit=2000)
@@ -0,0 +1,45 @@
+"""TZifData agrees with zoneinfo for every zone on this system (offline: reads the local tz database)."""
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from citytime import TZ_REGISTRY
+
+# Every ~40 days from 1900 to 2100, so rule-driven years past the last stored transition are covered too
+SAMPLES = range(-2208988800, 4102444800, 40 * 86400 + 3607)
+RULE_YEARS = (datetime(2030, 1, 1, tzinfo=timezone.utc).timestamp(),
+              datetime(2045, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _zoneinfo_state(zone: ZoneInfo, epoch: int):
+    local = datetime.fromtimestamp(epoch, zone)
+    return int(local.utcoffset().total_seconds()), local.tzname(), bool(local.dst())
+
+
+def test_state_at_matches_zoneinfo_for_all_zones():
+    zones = TZ_REGISTRY.sorted()
+    assert zones
+    mismatches = []
+    for key in zones:
+        data = TZ_REGISTRY.tzif(key)
+        zone = ZoneInfo(key)
+        transitions = [t for t in data.transitions if -2208988800 <= t < 4102444800]
+        rule_changes = [change[0] for change in data.transitions_between(*map(int, RULE_YEARS))]
+        instants = {t + delta for t in transitions + rule_changes for delta in (-1, 0, 1)}
+        instants.update(SAMPLES)
+        for epoch in sorted(instants):
+            ours = data.state_at(epoch)
+            expected = _zoneinfo_state(zone, epoch)
+            if ours != expected:
+                mismatches.append((key, epoch, ours, expected))
+    assert not mismatches, mismatches[:20]
+
+
+def test_transitions_between_reports_every_state_change():
+    data = TZ_REGISTRY.tzif("Europe/Paris")
+    start, end = map(int, RULE_YEARS)
+    changes = data.transitions_between(start, end)
+    assert len(changes) == 30
+    zone = ZoneInfo("Europe/Paris")
+    for epoch, offset, abbr, dst in changes:
+        assert _zoneinfo_state(zone, epoch) == (offset, abbr, dst)
+        assert _zoneinfo_state(zone, epoch - 1) != (offset, abbr, dst)